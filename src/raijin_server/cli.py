@@ -51,8 +51,21 @@ from raijin_server.modules import (
     vpn_manager,
     supabase_security,
 )
-from raijin_server.utils import ExecutionContext, logger, active_log_file, available_log_files, page_text, ensure_tool
-from raijin_server.validators import validate_system_requirements, check_module_dependencies, MODULE_DEPENDENCIES
+from raijin_server.utils import (
+    ExecutionContext,
+    logger,
+    active_log_file,
+    available_log_files,
+    page_text,
+    ensure_tool,
+    flush_diagnostics,
+)
+from raijin_server.validators import (
+    validate_system_requirements,
+    check_module_dependencies,
+    get_reverse_dependencies,
+    MODULE_DEPENDENCIES,
+)
 from raijin_server.healthchecks import run_health_check, validate_module_status, get_all_module_statuses
 from raijin_server.config import ConfigManager
 from raijin_server import module_manager
@@ -208,6 +221,8 @@ def _run_module(ctx: typer.Context, name: str, skip_validation: bool = False) ->
             typer.secho(f"\nErros ({len(exec_ctx.errors)}):", fg=typer.colors.RED)
             for err in exec_ctx.errors:
                 typer.echo(f"  ✗ {err}")
+        # Descarta o que ja foi exibido para nao repetir no proximo modulo da sessao
+        flush_diagnostics(exec_ctx)
                 
     except KeyboardInterrupt:
         logger.warning(f"Modulo '{name}' interrompido pelo usuario")
@@ -284,11 +299,7 @@ def _clear_completed(name: str) -> None:
 
 
 def _dependents_of(module: str) -> list[str]:
-    dependents = []
-    for mod, deps in MODULE_DEPENDENCIES.items():
-        if module in deps:
-            dependents.append(mod)
-    return dependents
+    return get_reverse_dependencies(module)
 
 
 def _default_rollback(exec_ctx: ExecutionContext, name: str) -> None:
@@ -473,6 +484,9 @@ def main(
     dry_run: bool = typer.Option(False, "-n", "--dry-run", help="Mostra comandos sem executa-los."),
     skip_validation: bool = typer.Option(False, "--skip-validation", help="Pula validacoes de pre-requisitos"),
     skip_root: bool = typer.Option(False, "--skip-root", help="Permite validar sem exigir root (nao recomendado)"),
+    force_validate: bool = typer.Option(
+        False, "--force-validate", help="Revalida pre-requisitos mesmo com validacao recente"
+    ),
     version: Optional[bool] = typer.Option(
         None,
         "--version",
@@ -488,7 +502,7 @@ def main(
 
     # Executa validacoes de pre-requisitos
     if not skip_validation and not dry_run:
-        if not validate_system_requirements(ctx.obj, skip_root=skip_root):
+        if not validate_system_requirements(ctx.obj, skip_root=skip_root, force=force_validate):
             typer.secho("\nAbortando devido a pre-requisitos nao atendidos.", fg=typer.colors.RED)
             typer.echo("Use --skip-validation para pular validacoes (nao recomendado).")
             raise typer.Exit(code=1)
@@ -719,10 +733,13 @@ def vpn_ctl_pause(ctx: typer.Context) -> None:
 
 
 @vpn_ctl_app.command(name="resume")
-def vpn_ctl_resume(ctx: typer.Context) -> None:
+def vpn_ctl_resume(
+    ctx: typer.Context,
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Mostra status completo ao final"),
+) -> None:
     """Retoma VPN - abre porta e ativa interface."""
     exec_ctx = ctx.obj or ExecutionContext()
-    vpn_manager.resume(exec_ctx)
+    vpn_manager.resume(exec_ctx, verbose=verbose)
 
 
 @vpn_ctl_app.command(name="schedule")
@@ -1094,11 +1111,19 @@ def generate_config(output: str = typer.Option("raijin-config.yaml", "--output",
 
 
 @app.command()
-def validate(skip_root: bool = typer.Option(False, "--skip-root", help="Pula validacao de root")) -> None:
+def validate(
+    skip_root: bool = typer.Option(False, "--skip-root", help="Pula validacao de root"),
+    abort_on_first_failure: bool = typer.Option(
+        False, "--abort-on-first-failure", help="Para na primeira validacao que falhar"
+    ),
+) -> None:
     """Valida pre-requisitos do sistema sem executar modulos."""
     
     ctx = ExecutionContext(dry_run=False)
-    if validate_system_requirements(ctx, skip_root=skip_root):
+    # Validacao explicita sempre executa as checagens, ignorando o marcador
+    if validate_system_requirements(
+        ctx, skip_root=skip_root, abort_on_first_failure=abort_on_first_failure, force=True
+    ):
         typer.secho("\n✓ Sistema validado com sucesso!", fg=typer.colors.GREEN, bold=True)
     else:
         typer.secho("\n✗ Sistema nao atende pre-requisitos", fg=typer.colors.RED, bold=True)
@@ -1323,7 +1348,6 @@ def list_modules(
             deps = MODULE_DEPENDENCIES.get(module_name, [])
             deps_str = ", ".join(deps) if deps else "-"
             
-            from raijin_server.validators import get_reverse_dependencies
             rev_deps = get_reverse_dependencies(module_name)
             rev_deps_str = ", ".join(rev_deps) if rev_deps else "-"
             
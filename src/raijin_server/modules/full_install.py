@@ -277,6 +277,9 @@ INSTALL_SEQUENCE = [
     ("kong", kong.run, "API Gateway Kong", "RAIJIN_SKIP_KONG"),
 ]
 
+# Nomes da sequencia para consultas de pertinencia
+INSTALL_SEQUENCE_NAMES = frozenset(name for name, *_ in INSTALL_SEQUENCE)
+
 
 def run(ctx: ExecutionContext) -> None:
     """Executa instalacao completa do ambiente produtivo."""
@@ -10,20 +10,187 @@ Comandos:
     raijin vpn-control schedule - Configura horários automáticos
 """
 
+import os
+import shlex
+import string
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import typer
 
-from raijin_server.utils import ExecutionContext, require_root, run_cmd, write_file
+from raijin_server.utils import (
+    ExecutionContext,
+    logger,
+    require_root,
+    run_cmd,
+    run_cmd_async,
+    run_concurrently,
+    write_file,
+)
 
 
 WG_INTERFACE = "wg0"
 WG_CONFIG = Path("/etc/wireguard/wg0.conf")
 STATE_FILE = Path("/var/lib/raijin-server/vpn-state")
-SCHEDULE_FILE = Path("/etc/cron.d/raijin-vpn-schedule")
+LEGACY_CRON_FILE = Path("/etc/cron.d/raijin-vpn-schedule")
+SYSTEMD_DIR = Path("/etc/systemd/system")
+SCHEDULE_LOG = "/var/log/raijin-vpn-schedule.log"
+# Acao agendada -> nome base das units (raijin-vpn-<acao>.service/.timer)
+SCHEDULE_ACTIONS = ("resume", "pause")
+IFF_UP = 0x1  # flag de link ativo (linux/if.h)
+VPN_PORT = os.environ.get("RAIJIN_VPN_PORT", "51820")
+
+SERVICE_TEMPLATE = string.Template("""# Raijin VPN Schedule - Gerado automaticamente
+[Unit]
+Description=Raijin VPN ${action} (agendamento)
+
+[Service]
+Type=oneshot
+ExecStart=/usr/local/bin/raijin vpn-control ${action}
+StandardOutput=append:${log}
+StandardError=append:${log}
+""")
+
+TIMER_TEMPLATE = string.Template("""# Raijin VPN Schedule - Gerado automaticamente
+[Unit]
+Description=Raijin VPN ${action} às ${hour}h
+
+[Timer]
+OnCalendar=*-*-* ${hour}:00:00
+
+[Install]
+WantedBy=timers.target
+""")
+
+
+def _parse_wg_dump(output: str) -> tuple[dict, list[dict]]:
+    """Interpreta a saida de ``wg show <iface> dump``.
+
+    A primeira linha descreve a interface (private-key, public-key, listen-port,
+    fwmark); as demais, um peer cada (public-key, preshared-key, endpoint,
+    allowed-ips, latest-handshake, transfer-rx, transfer-tx, persistent-keepalive).
+    """
+    interface: dict = {}
+    peers: list[dict] = []
+    lines = output.strip().splitlines()
+    if not lines:
+        return interface, peers
+    
+    parts = lines[0].split("\t")
+    if len(parts) >= 4:
+        interface = {"public_key": parts[1], "listen_port": parts[2], "fwmark": parts[3]}
+    
+    for line in lines[1:]:
+        parts = line.split("\t")
+        if len(parts) < 8:
+            continue
+        peers.append({
+            "public_key": parts[0],
+            "endpoint": parts[2],
+            "allowed_ips": parts[3],
+            "latest_handshake": int(parts[4]),
+            "rx_bytes": int(parts[5]),
+            "tx_bytes": int(parts[6]),
+            "persistent_keepalive": parts[7],
+        })
+    return interface, peers
+
+
+def _wg_dump() -> Optional[tuple[dict, list[dict]]]:
+    """Executa ``wg show <iface> dump`` uma vez; retorna None se falhar."""
+    result = subprocess.run(
+        ["wg", "show", WG_INTERFACE, "dump"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return _parse_wg_dump(result.stdout)
+
+
+def _netlink_link_state() -> Optional[tuple[bool, bool]]:
+    """Consulta via netlink se a interface existe e se esta UP (None se indisponivel)."""
+    try:
+        # Import tardio: pyroute2 custa centenas de ms e so e usado aqui
+        from pyroute2 import IPRoute
+
+        with IPRoute() as ipr:
+            links = ipr.link_lookup(ifname=WG_INTERFACE)
+            if not links:
+                return False, False
+            return True, bool(ipr.get_links(links[0])[0]["flags"] & IFF_UP)
+    except Exception:
+        return None
+
+
+def _netlink_wg_info() -> Optional[tuple[dict, list[dict]]]:
+    """Le interface e peers via netlink, no mesmo formato de ``_parse_wg_dump``.
+
+    Retorna None quando pyroute2 nao esta instalado ou a consulta falha
+    (ex.: sem CAP_NET_ADMIN), para que o chamador use ``wg show dump``.
+    """
+    try:
+        from pyroute2 import WireGuard
+
+        with WireGuard() as wg:
+            msg = wg.info(WG_INTERFACE)[0]
+    except Exception:
+        return None
+    
+    public_key = msg.get_attr("WGDEVICE_A_PUBLIC_KEY")
+    interface = {
+        "public_key": public_key["value"].decode() if public_key else "(none)",
+        "listen_port": str(msg.get_attr("WGDEVICE_A_LISTEN_PORT") or 0),
+        "fwmark": str(msg.get_attr("WGDEVICE_A_FWMARK") or "off"),
+    }
+    peers: list[dict] = []
+    for peer in msg.get_attr("WGDEVICE_A_PEERS") or []:
+        peer_key = peer.get_attr("WGPEER_A_PUBLIC_KEY")
+        endpoint = peer.get_attr("WGPEER_A_ENDPOINT")
+        handshake = peer.get_attr("WGPEER_A_LAST_HANDSHAKE_TIME")
+        allowed_ips = peer.get_attr("WGPEER_A_ALLOWEDIPS") or []
+        peers.append({
+            "public_key": peer_key["value"].decode() if peer_key else "(none)",
+            "endpoint": f"{endpoint['addr']}:{endpoint['port']}" if endpoint else "(none)",
+            "allowed_ips": ",".join(ip["addr"] for ip in allowed_ips) or "(none)",
+            "latest_handshake": int(handshake["tv_sec"]) if handshake else 0,
+            "rx_bytes": int(peer.get_attr("WGPEER_A_RX_BYTES") or 0),
+            "tx_bytes": int(peer.get_attr("WGPEER_A_TX_BYTES") or 0),
+            "persistent_keepalive": str(peer.get_attr("WGPEER_A_PERSISTENT_KEEPALIVE_INTERVAL") or "off"),
+        })
+    return interface, peers
+
+
+def _link_state() -> tuple[bool, bool]:
+    """Retorna (existe, UP) da interface: netlink quando possivel, senao ``ip link show``."""
+    link_state = _netlink_link_state()
+    if link_state is not None:
+        return link_state
+    result = subprocess.run(
+        ["ip", "link", "show", WG_INTERFACE],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    return result.returncode == 0, result.returncode == 0 and "UP" in result.stdout
+
+
+def _wg_info() -> Optional[tuple[dict, list[dict]]]:
+    """Interface e peers do WireGuard: netlink quando possivel, senao ``wg show dump``."""
+    info = _netlink_wg_info()
+    if info is not None:
+        return info
+    return _wg_dump()
+
+
+def _format_bytes(num: int) -> str:
+    """Formata contagem de bytes em unidade legivel (B, KiB, MiB...)."""
+    value = float(num)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} TiB"
 
 
 def _get_wg_status() -> dict:
@@ -31,14 +198,17 @@ def _get_wg_status() -> dict:
     status = {
         "installed": False,
         "config_exists": False,
+        "interface_exists": False,
         "interface_up": False,
         "peers_connected": 0,
         "last_handshake": None,
         "paused": False,
+        "interface": {},
+        "peers": [],
     }
     
     # Verifica se WireGuard está instalado
-    result = subprocess.run(["which", "wg"], capture_output=True)
+    result = subprocess.run(["which", "wg"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     status["installed"] = result.returncode == 0
     
     if not status["installed"]:
@@ -47,56 +217,155 @@ def _get_wg_status() -> dict:
     # Verifica se config existe
     status["config_exists"] = WG_CONFIG.exists()
     
-    # Verifica se interface está up
-    result = subprocess.run(
-        ["ip", "link", "show", WG_INTERFACE],
-        capture_output=True, text=True
-    )
-    status["interface_up"] = result.returncode == 0 and "UP" in result.stdout
+    # Link, peers e arquivo de estado sao independentes: consulta em paralelo
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        f_link = executor.submit(_link_state)
+        f_wg = executor.submit(_wg_info)
+        f_state = executor.submit(_read_state)
+        status["interface_exists"], status["interface_up"] = f_link.result()
+        dump = f_wg.result()
+        status["paused"] = f_state.result() == "paused"
+    
+    # Interface + peers em uma unica chamada (dump traz handshake e trafego)
+    if status["interface_up"] and dump is not None:
+        status["interface"], status["peers"] = dump
+        now = datetime.now().timestamp()
+        for peer in status["peers"]:
+            timestamp = peer["latest_handshake"]
+            if timestamp > 0:
+                status["peers_connected"] += 1
+                # Handshake nos últimos 3 minutos = conectado
+                if (now - timestamp) < 180:
+                    status["last_handshake"] = datetime.fromtimestamp(timestamp)
     
-    # Conta peers conectados
-    if status["interface_up"]:
+    return status
+
+
+def _read_state() -> str:
+    """Le o estado salvo da VPN (string vazia se nunca pausada)."""
+    try:
+        return STATE_FILE.read_text().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def _write_state(state: str) -> None:
+    """Grava o estado da VPN de forma atomica (arquivo temporario + rename)."""
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(state)
+    os.replace(tmp, STATE_FILE)
+
+
+def _ufw_rule_present(port: str) -> Optional[bool]:
+    """Indica se ha regra ufw liberando ``<port>/udp`` (None se ufw indisponivel ou inativo)."""
+    try:
         result = subprocess.run(
-            ["wg", "show", WG_INTERFACE, "latest-handshakes"],
-            capture_output=True, text=True
+            ["ufw", "status"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
         )
-        if result.returncode == 0:
-            for line in result.stdout.strip().splitlines():
-                parts = line.split()
-                if len(parts) >= 2:
-                    timestamp = int(parts[1])
-                    if timestamp > 0:
-                        status["peers_connected"] += 1
-                        # Handshake nos últimos 3 minutos = conectado
-                        if (datetime.now().timestamp() - timestamp) < 180:
-                            status["last_handshake"] = datetime.fromtimestamp(timestamp)
-    
-    # Verifica estado de pausa
-    if STATE_FILE.exists():
-        state = STATE_FILE.read_text().strip()
-        status["paused"] = state == "paused"
-    
-    return status
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return _ufw_status_has_rule(result.stdout, port)
 
 
-def _firewall_close_vpn(ctx: ExecutionContext) -> None:
-    """Fecha porta da VPN no firewall."""
-    import os
-    vpn_port = os.environ.get("RAIJIN_VPN_PORT", "51820")
-    
-    typer.echo(f"Fechando porta UDP {vpn_port} no firewall...")
-    run_cmd(["ufw", "delete", "allow", f"{vpn_port}/udp"], ctx, check=False)
-    run_cmd(["ufw", "reload"], ctx, check=False)
+def _ufw_status_has_rule(output: str, port: str) -> Optional[bool]:
+    """Procura ``<port>/udp`` na primeira coluna da saida de ``ufw status``.
+
+    Com o ufw inativo a saida nao lista regras: retorna None (desconhecido)
+    para que pause/resume executem os comandos de firewall mesmo assim.
+    """
+    lines = output.splitlines()
+    if not lines or lines[0].strip() != "Status: active":
+        return None
+    rule = f"{port}/udp"
+    return any(line.split(maxsplit=1)[0] == rule for line in lines[1:] if line.strip())
 
 
-def _firewall_open_vpn(ctx: ExecutionContext) -> None:
-    """Abre porta da VPN no firewall."""
-    import os
-    vpn_port = os.environ.get("RAIJIN_VPN_PORT", "51820")
-    
-    typer.echo(f"Abrindo porta UDP {vpn_port} no firewall...")
-    run_cmd(["ufw", "allow", f"{vpn_port}/udp", "comment", "WireGuard VPN"], ctx, check=False)
-    run_cmd(["ufw", "reload"], ctx, check=False)
+def _firewall_close_vpn_cmds() -> list[list[str]]:
+    """Comandos para fechar porta da VPN no firewall."""
+    typer.echo(f"Fechando porta UDP {VPN_PORT} no firewall...")
+    return [
+        ["ufw", "delete", "allow", f"{VPN_PORT}/udp"],
+        ["ufw", "reload"],
+    ]
+
+
+def _firewall_open_vpn_cmds() -> list[list[str]]:
+    """Comandos para abrir porta da VPN no firewall."""
+    typer.echo(f"Abrindo porta UDP {VPN_PORT} no firewall...")
+    return [
+        ["ufw", "allow", f"{VPN_PORT}/udp", "comment", "WireGuard VPN"],
+        ["ufw", "reload"],
+    ]
+
+
+async def _run_sequence(cmds: Sequence[Sequence[str]], ctx: ExecutionContext) -> None:
+    """Executa comandos em sequencia sem bloquear o event loop (equivale a check=False)."""
+    for cmd in cmds:
+        try:
+            result = await run_cmd_async(cmd, ctx, check=False)
+        except Exception as e:
+            msg = f"Erro ao executar '{shlex.join(cmd)}': {type(e).__name__}: {e}"
+            logger.error(msg)
+            ctx.errors.append(msg)
+            return
+        if result.returncode != 0:
+            logger.warning(f"Comando '{shlex.join(cmd)}' retornou {result.returncode}: {(result.stderr or '').strip()}")
+
+
+def _run_parallel(groups: Sequence[Sequence[Sequence[str]]], ctx: ExecutionContext) -> None:
+    """Executa grupos de comandos independentes em paralelo.
+
+    Cada grupo roda em sequencia (ex.: ``ufw delete`` seguido de ``ufw reload``),
+    mas grupos distintos se sobrepoem, de modo que o tempo total fica proximo
+    do grupo mais lento.
+    """
+    run_concurrently(*(_run_sequence(group, ctx) for group in groups))
+
+
+def _read_wg_config() -> str:
+    try:
+        return WG_CONFIG.read_text()
+    except OSError:
+        return ""
+
+
+def _config_requires_wg_quick(config: str) -> bool:
+    """Indica se ``ip link set up`` nao basta para restaurar a interface.
+
+    O link down descarta enderecos IPv6 (keep_addr_on_down=0) e as rotas do
+    tunel total (AllowedIPs /0, roteadas por tabela/fwmark do wg-quick).
+    """
+    for raw in config.splitlines():
+        key, sep, value = raw.partition("=")
+        if not sep:
+            continue
+        key = key.strip().lower()
+        values = [v.strip() for v in value.split(",")]
+        if key == "address" and any(":" in v for v in values):
+            return True
+        if key == "allowedips" and any(v.endswith("/0") for v in values):
+            return True
+    return False
+
+
+def _route_restore_cmds(peers: Sequence[dict]) -> list[list[str]]:
+    """Comandos ``ip route replace`` para os AllowedIPs de cada peer."""
+    cmds = []
+    for peer in peers:
+        for allowed in peer.get("allowed_ips", "").split(","):
+            allowed = allowed.strip()
+            if not allowed or allowed == "(none)":
+                continue
+            family = ["-6"] if ":" in allowed else []
+            cmds.append(["ip", *family, "route", "replace", allowed, "dev", WG_INTERFACE])
+    return cmds
+
+
+def _schedule_unit(action: str, suffix: str) -> Path:
+    """Caminho da unit systemd do agendamento (``suffix``: service ou timer)."""
+    return SYSTEMD_DIR / f"raijin-vpn-{action}.{suffix}"
 
 
 def status(ctx: ExecutionContext) -> None:
@@ -135,13 +404,23 @@ def status(ctx: ExecutionContext) -> None:
     # Detalhes WireGuard
     if status["interface_up"]:
         typer.secho("\n📊 Detalhes da Interface:", fg=typer.colors.CYAN)
-        result = subprocess.run(
-            ["wg", "show", WG_INTERFACE],
-            capture_output=True, text=True
-        )
-        if result.returncode == 0:
-            for line in result.stdout.splitlines():
-                typer.echo(f"  {line}")
+        interface = status["interface"]
+        if interface:
+            typer.echo(f"  interface: {WG_INTERFACE}")
+            typer.echo(f"    public key: {interface['public_key']}")
+            typer.echo(f"    listening port: {interface['listen_port']}")
+        for peer in status["peers"]:
+            typer.echo(f"\n  peer: {peer['public_key']}")
+            if peer["endpoint"] != "(none)":
+                typer.echo(f"    endpoint: {peer['endpoint']}")
+            typer.echo(f"    allowed ips: {peer['allowed_ips']}")
+            if peer["latest_handshake"] > 0:
+                handshake = datetime.fromtimestamp(peer["latest_handshake"])
+                typer.echo(f"    latest handshake: {handshake.strftime('%Y-%m-%d %H:%M:%S')}")
+            typer.echo(
+                f"    transfer: {_format_bytes(peer['rx_bytes'])} received, "
+                f"{_format_bytes(peer['tx_bytes'])} sent"
+            )
 
 
 def pause(ctx: ExecutionContext) -> None:
@@ -166,12 +445,14 @@ def pause(ctx: ExecutionContext) -> None:
         if not typer.confirm("Continuar?", default=True):
             return
     
-    # 1. Desativar interface
+    # 1. Desativar interface e 2. fechar porta no firewall (independentes, em paralelo)
     typer.echo("Desativando interface WireGuard...")
-    run_cmd(["wg-quick", "down", WG_INTERFACE], ctx, check=False)
-    
-    # 2. Fechar porta no firewall
-    _firewall_close_vpn(ctx)
+    groups = [[["ip", "link", "set", "dev", WG_INTERFACE, "down"]]]
+    if _ufw_rule_present(VPN_PORT) is False:
+        typer.echo(f"Porta UDP {VPN_PORT} já está fechada no firewall.")
+    else:
+        groups.append(_firewall_close_vpn_cmds())
+    _run_parallel(groups, ctx)
     
     # 3. Desabilitar serviço
     typer.echo("Desabilitando serviço WireGuard...")
@@ -180,7 +461,7 @@ def pause(ctx: ExecutionContext) -> None:
     # 4. Salvar estado
     STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not ctx.dry_run:
-        STATE_FILE.write_text("paused")
+        _write_state("paused")
     
     typer.secho("\n✓ VPN pausada com sucesso!", fg=typer.colors.GREEN)
     typer.echo("  • Interface desativada")
@@ -189,44 +470,73 @@ def pause(ctx: ExecutionContext) -> None:
     typer.echo("\nPara retomar: raijin vpn-control resume")
 
 
-def resume(ctx: ExecutionContext) -> None:
-    """Retoma a VPN - abre porta e ativa interface."""
+def resume(ctx: ExecutionContext, verbose: bool = False) -> None:
+    """Retoma a VPN - abre porta e ativa interface.
+    
+    Args:
+        verbose: Exibe o status completo ao final (em vez do resumo)
+    """
     require_root(ctx)
     
-    status = _get_wg_status()
+    wg_status = _get_wg_status()
     
-    if not status["paused"] and status["interface_up"]:
+    if not wg_status["paused"] and wg_status["interface_up"]:
         typer.secho("VPN já está ativa.", fg=typer.colors.YELLOW)
         return
     
-    if not status["config_exists"]:
+    if not wg_status["config_exists"]:
         typer.secho("VPN não configurada.", fg=typer.colors.RED)
         return
     
     typer.secho("\n▶️ Retomando VPN...", fg=typer.colors.CYAN, bold=True)
     
-    # 1. Abrir porta no firewall
-    _firewall_open_vpn(ctx)
+    # 1. Abrir porta no firewall e 2. ativar interface (independentes, em paralelo)
+    typer.echo("Ativando interface WireGuard...")
+    # Interface ja carregada no kernel: basta subir o link e reaplicar as rotas
+    # dos peers (o link down as remove). Sem ela (boot apos pause, primeira
+    # ativacao) ou com config que o link up nao restaura (IPv6, tunel total),
+    # wg-quick recria interface, enderecos e rotas.
+    if not wg_status["interface_exists"]:
+        groups = [[["wg-quick", "up", WG_INTERFACE]]]
+    elif _config_requires_wg_quick(_read_wg_config()):
+        groups = [[["wg-quick", "down", WG_INTERFACE], ["wg-quick", "up", WG_INTERFACE]]]
+    else:
+        # Peers continuam configurados no device mesmo com o link down
+        info = _wg_info()
+        route_cmds = _route_restore_cmds(info[1] if info else [])
+        groups = [[["ip", "link", "set", "dev", WG_INTERFACE, "up"], *route_cmds]]
+    if _ufw_rule_present(VPN_PORT):
+        typer.echo(f"Porta UDP {VPN_PORT} já está aberta no firewall.")
+    else:
+        groups.append(_firewall_open_vpn_cmds())
+    _run_parallel(groups, ctx)
     
-    # 2. Habilitar serviço
+    # 3. Habilitar serviço
     typer.echo("Habilitando serviço WireGuard...")
     run_cmd(["systemctl", "enable", f"wg-quick@{WG_INTERFACE}"], ctx, check=False)
     
-    # 3. Ativar interface
-    typer.echo("Ativando interface WireGuard...")
-    run_cmd(["wg-quick", "up", WG_INTERFACE], ctx, check=False)
-    
     # 4. Atualizar estado
     if not ctx.dry_run and STATE_FILE.exists():
-        STATE_FILE.write_text("active")
+        _write_state("active")
     
     typer.secho("\n✓ VPN retomada com sucesso!", fg=typer.colors.GREEN)
     typer.echo("  • Porta aberta no firewall")
     typer.echo("  • Serviço habilitado")
     typer.echo("  • Interface ativada")
     
+    if ctx.dry_run:
+        return
+    
     # Mostrar status
-    status(ctx)
+    if verbose:
+        status(ctx)
+        return
+    
+    dump = _wg_info()
+    if dump is not None:
+        interface, peers = dump
+        port = interface.get("listen_port", "?")
+        typer.echo(f"\n  {WG_INTERFACE}: porta {port}, {len(peers)} peer(s) configurado(s)")
 
 
 def schedule(ctx: ExecutionContext, enable: bool = True, start_hour: int = 8, end_hour: int = 22) -> None:
@@ -242,11 +552,17 @@ def schedule(ctx: ExecutionContext, enable: bool = True, start_hour: int = 8, en
     """
     require_root(ctx)
     
+    timers = [_schedule_unit(action, "timer").name for action in SCHEDULE_ACTIONS]
+    
     if not enable:
         typer.echo("Removendo agendamento...")
-        if SCHEDULE_FILE.exists() and not ctx.dry_run:
-            SCHEDULE_FILE.unlink()
-        run_cmd(["systemctl", "restart", "cron"], ctx, check=False)
+        run_cmd(["systemctl", "disable", "--now", *timers], ctx, check=False)
+        if not ctx.dry_run:
+            for action in SCHEDULE_ACTIONS:
+                for suffix in ("timer", "service"):
+                    _schedule_unit(action, suffix).unlink(missing_ok=True)
+            LEGACY_CRON_FILE.unlink(missing_ok=True)
+        run_cmd(["systemctl", "daemon-reload"], ctx, check=False)
         typer.secho("✓ Agendamento removido.", fg=typer.colors.GREEN)
         return
     
@@ -254,45 +570,48 @@ def schedule(ctx: ExecutionContext, enable: bool = True, start_hour: int = 8, en
     typer.echo(f"  VPN ATIVA:  {start_hour:02d}:00 - {end_hour:02d}:00")
     typer.echo(f"  VPN PAUSADA: {end_hour:02d}:00 - {start_hour:02d}:00")
     
-    cron_content = f"""# Raijin VPN Schedule - Gerado automaticamente
-# VPN ativa das {start_hour}h às {end_hour}h
-SHELL=/bin/bash
-PATH=/usr/local/sbin:/usr/local/bin:/sbin:/bin:/usr/sbin:/usr/bin
-
-# Ativar VPN às {start_hour}h
-0 {start_hour} * * * root /usr/local/bin/raijin vpn-control resume >> /var/log/raijin-vpn-schedule.log 2>&1
-
-# Pausar VPN às {end_hour}h
-0 {end_hour} * * * root /usr/local/bin/raijin vpn-control pause >> /var/log/raijin-vpn-schedule.log 2>&1
-"""
-    
-    typer.echo(f"\nCriando {SCHEDULE_FILE}...")
-    write_file(SCHEDULE_FILE, cron_content, ctx)
+    hours = {"resume": start_hour, "pause": end_hour}
+    for action in SCHEDULE_ACTIONS:
+        service = _schedule_unit(action, "service")
+        timer = _schedule_unit(action, "timer")
+        typer.echo(f"\nCriando {service} e {timer}...")
+        write_file(service, SERVICE_TEMPLATE.substitute(action=action, log=SCHEDULE_LOG), ctx)
+        write_file(timer, TIMER_TEMPLATE.substitute(action=action, hour=f"{hours[action]:02d}"), ctx)
     
-    if not ctx.dry_run:
-        SCHEDULE_FILE.chmod(0o644)
+    # Remove agendamento antigo via cron.d, se existir, para nao disparar em dobro
+    if LEGACY_CRON_FILE.exists() and not ctx.dry_run:
+        LEGACY_CRON_FILE.unlink()
     
-    run_cmd(["systemctl", "restart", "cron"], ctx, check=False)
+    run_cmd(["systemctl", "daemon-reload"], ctx, check=False)
+    run_cmd(["systemctl", "enable", "--now", *timers], ctx, check=False)
     
     typer.secho("\n✓ Agendamento configurado!", fg=typer.colors.GREEN)
-    typer.echo(f"\nLogs em: /var/log/raijin-vpn-schedule.log")
+    typer.echo(f"\nLogs em: {SCHEDULE_LOG}")
+    typer.echo("Próximos disparos: systemctl list-timers 'raijin-vpn-*'")
     typer.echo("Para desativar: raijin vpn-control schedule --disable")
 
 
-def run(ctx: ExecutionContext, action: str = "status") -> None:
+_ACTIONS = {
+    "status": status,
+    "pause": pause,
+    "resume": resume,
+    "schedule": schedule,
+}
+
+
+def run(ctx: ExecutionContext, action: str = "status", verbose: bool = False) -> None:
     """Gerencia VPN WireGuard.
     
     Args:
         action: status|pause|resume|schedule
+        verbose: Exibe status completo apos resume
     """
-    if action == "status":
-        status(ctx)
-    elif action == "pause":
-        pause(ctx)
-    elif action == "resume":
-        resume(ctx)
-    elif action == "schedule":
-        schedule(ctx)
-    else:
+    fn = _ACTIONS.get(action)
+    if fn is None:
         typer.secho(f"Ação desconhecida: {action}", fg=typer.colors.RED)
-        typer.echo("Ações válidas: status, pause, resume, schedule")
+        typer.echo(f"Ações válidas: {', '.join(_ACTIONS)}")
+        return
+    if fn is resume:
+        resume(ctx, verbose=verbose)
+    else:
+        fn(ctx)
@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
+import json
 import logging
 import os
+import random
+import re
 import shlex
 import shutil
 import subprocess
+import sys
+import threading
 import time
+from collections import deque
 from logging.handlers import RotatingFileHandler
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Iterable, Mapping, MutableMapping, Sequence
+from typing import Awaitable, Iterable, Mapping, Sequence
 
 import typer
 
@@ -25,19 +34,119 @@ except PermissionError:
 
 MAX_LOG_BYTES = int(os.environ.get("RAIJIN_LOG_MAX_BYTES", 20 * 1024 * 1024))  # 20MB default
 BACKUP_COUNT = int(os.environ.get("RAIJIN_LOG_BACKUP_COUNT", 5))
+LOG_BUFFER_CAPACITY = int(os.environ.get("RAIJIN_LOG_BUFFER_CAPACITY", 256))  # registros por escrita
+LOG_FLUSH_INTERVAL = float(os.environ.get("RAIJIN_LOG_FLUSH_INTERVAL", 30.0))  # segundos
+STREAM_TAIL_LINES = 4096  # Linhas finais retidas de comandos executados com stream_output
 
 logger = logging.getLogger("raijin-server")
 logger.setLevel(logging.INFO)
 
 
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler que agrupa registros em uma unica escrita.
+
+    Registros formatados ficam em memoria e sao gravados de uma vez quando o
+    buffer atinge ``capacity``, a cada ``flush_interval`` segundos (thread
+    daemon) ou imediatamente em ERROR ou acima. A checagem de rotacao e feita
+    por lote. ``logging.shutdown`` (atexit) chama ``flush``/``close``, entao
+    nada se perde no encerramento normal.
+    """
+
+    def __init__(
+        self,
+        filename: str | os.PathLike,
+        *,
+        capacity: int = 256,
+        flush_interval: float = 30.0,
+        flush_level: int = logging.ERROR,
+        **kwargs,
+    ) -> None:
+        super().__init__(filename, **kwargs)
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self._buffer: list[str] = []
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, args=(flush_interval,), name="raijin-log-flush", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def _open(self):
+        stream = super()._open()
+        # Recalculado so ao (re)abrir o arquivo, ou seja, apos cada rotacao
+        self._is_real_file = os.path.isfile(self.baseFilename)
+        return stream
+
+    def _needs_rollover(self, size: int) -> bool:
+        """Rotacao necessaria antes de gravar ``size`` caracteres?
+
+        Caminho comum (cabe no arquivo) usa apenas ``tell()``, sem stat; a
+        checagem de arquivo regular (evita rotacionar /dev/null etc.) vem do
+        valor cacheado em ``_open``.
+        """
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        pos = self.stream.tell()
+        if pos + size < self.maxBytes:
+            return False
+        return pos > 0 and self._is_real_file
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        return int(self._needs_rollover(len(self.format(record)) + len(self.terminator)))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.capacity or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if not self._buffer:
+                return
+            chunk = "".join(self._buffer)
+            self._buffer.clear()
+            if self._needs_rollover(len(chunk)):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(chunk)
+            self.stream.flush()
+        except Exception:
+            self.handleError(None)
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+        super().close()
+
+
 def _build_file_handler() -> RotatingFileHandler:
     """Cria handler com fallback para $HOME quando /var/log exige root."""
+    options = {
+        "maxBytes": MAX_LOG_BYTES,
+        "backupCount": BACKUP_COUNT,
+        "capacity": LOG_BUFFER_CAPACITY,
+        "flush_interval": LOG_FLUSH_INTERVAL,
+    }
     try:
-        return RotatingFileHandler(LOG_FILE, maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT)
+        return BufferedRotatingFileHandler(LOG_FILE, **options)
     except PermissionError:
         fallback = Path.home() / ".raijin-server.log"
         fallback.parent.mkdir(parents=True, exist_ok=True)
-        return RotatingFileHandler(fallback, maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT)
+        return BufferedRotatingFileHandler(fallback, **options)
 
 
 file_handler = _build_file_handler()
@@ -54,14 +163,55 @@ def available_log_files() -> list[Path]:
     return [p for p in sorted(base.parent.glob(pattern)) if p.is_file()]
 
 
+PAGER = shutil.which("less")
+
+
+PAGER_CHUNK_SIZE = 64 * 1024
+
+
 def page_text(content: str) -> None:
-    pager = shutil.which("less")
-    if pager:
-        subprocess.run([pager, "-R"], input=content, text=True, check=False)
-    else:
+    """Exibe texto via `less`, ou direto no terminal quando cabe na tela."""
+    # Conteudo curto (ou saida redirecionada) nao justifica fork/exec do pager
+    fits_screen = content.count("\n") < shutil.get_terminal_size().lines
+    if not PAGER or fits_screen or not sys.stdout.isatty():
         typer.echo(content)
+        return
+
+    proc = subprocess.Popen([PAGER, "-R"], stdin=subprocess.PIPE, text=True)
+    try:
+        for start in range(0, len(content), PAGER_CHUNK_SIZE):
+            proc.stdin.write(content[start:start + PAGER_CHUNK_SIZE])
+        proc.stdin.close()
+    except BrokenPipeError:
+        # Usuario saiu do pager antes do fim do conteudo
+        pass
+    proc.wait()
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter que reaproveita o strftime do asctime dentro do mesmo segundo.
+
+    A saida e identica a do Formatter padrao; so os milissegundos sao
+    recalculados por registro.
+    """
+
+    def __init__(self, fmt: str | None = None, datefmt: str | None = None) -> None:
+        super().__init__(fmt, datefmt)
+        # (segundo, texto) numa tupla: troca atomica entre threads
+        self._time_cache: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        if datefmt or self.datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, text = self._time_cache
+        if second != cached_second:
+            text = time.strftime(self.default_time_format, self.converter(second))
+            self._time_cache = (second, text)
+        return self.default_msec_format % (text, record.msecs)
+
 
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+formatter = CachedTimeFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 file_handler.setFormatter(formatter)
 stream_handler.setFormatter(formatter)
 
@@ -74,7 +224,44 @@ PACKAGE_ROOT = Path(__file__).resolve().parent
 SCRIPTS_DIR = PACKAGE_ROOT / "scripts"
 
 
-@dataclass
+CTX_MESSAGES_MAXLEN = 512  # Limite de erros/avisos retidos em ExecutionContext
+
+
+class MessageLog(deque):
+    """Fila limitada de mensagens que agrega repeticoes consecutivas.
+
+    Uma mensagem igual a anterior nao ocupa nova posicao: a ultima entrada
+    passa a ser exibida como ``"<msg> (xN)"``.
+    """
+
+    __slots__ = ("_last", "_repeats")
+
+    def __init__(self, iterable=(), maxlen: int | None = CTX_MESSAGES_MAXLEN) -> None:
+        super().__init__((), maxlen)
+        self._last: str | None = None
+        self._repeats = 1
+        for item in iterable:
+            self.append(item)
+
+    def append(self, msg: str) -> None:
+        if self and msg == self._last:
+            self._repeats += 1
+            self[-1] = f"{msg} (x{self._repeats})"
+            return
+        self._last = msg
+        self._repeats = 1
+        super().append(msg)
+
+    def clear(self) -> None:
+        super().clear()
+        self._last = None
+        self._repeats = 1
+
+# slots reduz memoria/acesso a atributos; so disponivel em dataclass no Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class ExecutionContext:
     """Contexto de execucao compartilhado entre modulos."""
 
@@ -83,9 +270,10 @@ class ExecutionContext:
     max_retries: int = 5
     retry_delay: int = 10
     retry_backoff: float = 1.5  # Multiplier for exponential backoff
+    retry_max_delay: int = 300  # Teto do backoff antes do jitter
     timeout: int = 600  # 10 min for slow connections
-    errors: list = field(default_factory=list)
-    warnings: list = field(default_factory=list)
+    errors: MessageLog = field(default_factory=MessageLog)
+    warnings: MessageLog = field(default_factory=MessageLog)
     # Controle interativo/diagnostico
     selected_steps: list[str] | None = None
     confirm_each_step: bool = False
@@ -93,13 +281,43 @@ class ExecutionContext:
     post_diagnose: bool = False
     color_prompts: bool = True
     interactive_steps: bool = False
+    # RNG do jitter de retry (None = SystemRandom); injetavel em testes
+    rng: random.Random | None = field(default=None, repr=False, compare=False)
+
+
+def flush_diagnostics(ctx: ExecutionContext) -> None:
+    """Descarta avisos/erros ja exibidos ao fim de um modulo.
+
+    Nada e registrado de novo: cada mensagem ja foi para o log quando
+    adicionada (ex.: em `run_cmd`) e o resumo do modulo ja foi impresso.
+    """
+    ctx.warnings.clear()
+    ctx.errors.clear()
+
+
+def _scan_scripts() -> dict[str, Path]:
+    try:
+        with os.scandir(SCRIPTS_DIR) as entries:
+            return {entry.name: Path(entry.path) for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return {}
+
+
+# Scripts empacotados nao mudam apos a instalacao: indexa uma vez no import
+_SCRIPT_CACHE: dict[str, Path] = _scan_scripts()
+
+
+def _refresh_scripts() -> None:
+    """Reindexa SCRIPTS_DIR (testes/desenvolvimento com scripts adicionados)."""
+    global _SCRIPT_CACHE
+    _SCRIPT_CACHE = _scan_scripts()
 
 
 def resolve_script_path(script_name: str) -> Path:
     """Retorna caminho absoluto para um script empacotado com o CLI."""
 
-    script_path = SCRIPTS_DIR / script_name
-    if not script_path.exists():
+    script_path = _SCRIPT_CACHE.get(script_name)
+    if script_path is None:
         raise FileNotFoundError(f"Script '{script_name}' nao encontrado em {SCRIPTS_DIR}")
     return script_path
 
@@ -121,7 +339,139 @@ def run_packaged_script(
 def _format_cmd(cmd: Sequence[str] | str) -> str:
     if isinstance(cmd, str):
         return cmd
-    return " ".join(shlex.quote(str(part)) for part in cmd)
+    return " ".join(map(shlex.quote, map(str, cmd)))
+
+
+_SYSTEM_RANDOM = random.SystemRandom()
+
+# Snapshot do ambiente usado por run_cmd; os.environ nao muda durante uma sessao
+_BASE_ENV: dict[str, str] = dict(os.environ)
+
+
+def refresh_base_env() -> None:
+    """Atualiza o snapshot de ambiente apos alteracoes em os.environ."""
+    global _BASE_ENV
+    _BASE_ENV = dict(os.environ)
+
+
+def _run_streaming(
+    cmd: Sequence[str] | str,
+    *,
+    shell: bool,
+    cwd: str | None,
+    env: Mapping[str, str],
+    timeout: int,
+    check: bool,
+    echo: bool,
+) -> subprocess.CompletedProcess:
+    """Executa comando repassando a saida linha a linha, com memoria limitada.
+
+    stdout e stderr sao unidos; apenas as ultimas ``STREAM_TAIL_LINES`` linhas
+    ficam em memoria e voltam em ``CompletedProcess.stdout``. Levanta as mesmas
+    excecoes de ``subprocess.run`` (TimeoutExpired/CalledProcessError).
+    """
+    tail: deque[str] = deque(maxlen=STREAM_TAIL_LINES)
+    proc = subprocess.Popen(
+        cmd,
+        shell=shell,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        text=True,
+        errors="replace",
+    )
+
+    def _pump() -> None:
+        stream = proc.stdout
+        try:
+            for line in stream:
+                tail.append(line)
+                if echo:
+                    typer.echo(line, nl=False)
+        except Exception as e:
+            logger.warning("Falha ao ler saida de %s: %s: %s", _format_cmd(cmd), type(e).__name__, e)
+            # Continua drenando em binario: com o pipe cheio o filho travaria ate o timeout
+            with contextlib.suppress(Exception):
+                while stream.buffer.read(65536):
+                    pass
+
+    reader = threading.Thread(target=_pump, daemon=True)
+    reader.start()
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        reader.join(timeout=5)
+        raise subprocess.TimeoutExpired(cmd, timeout, output="".join(tail))
+    reader.join()
+    output = "".join(tail)
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, output=output)
+    return subprocess.CompletedProcess(args=cmd, returncode=returncode, stdout=output)
+
+
+@functools.lru_cache(maxsize=32)
+def _backoff_schedule(
+    retry_delay: float, retry_backoff: float, retry_max_delay: float, attempts: int
+) -> tuple[float, ...]:
+    """Tetos de espera por tentativa (delay * backoff^i limitado ao maximo).
+
+    Calculado uma vez por combinacao de parametros; o loop de retry so indexa.
+    """
+    return tuple(min(retry_delay * retry_backoff**i, retry_max_delay) for i in range(attempts))
+
+
+def _backoff_delay(ctx: ExecutionContext, attempt: int) -> float:
+    """Backoff exponencial com full jitter: uniforme em [0, min(exp, teto)].
+
+    O jitter evita que varias execucoes (ou processos) repitam o comando no
+    mesmo instante contra um mirror/registry ja sobrecarregado.
+    """
+    schedule = _backoff_schedule(
+        ctx.retry_delay, ctx.retry_backoff, ctx.retry_max_delay, max(attempt, ctx.max_retries)
+    )
+    rng = ctx.rng or _SYSTEM_RANDOM
+    return rng.uniform(0, schedule[attempt - 1])
+
+
+_RETRY_PROMPTS = {
+    "timeout": "Timeout! Aguardando {delay:.1f}s antes de tentar novamente...",
+    "failed": "Tentando novamente em {delay:.1f}s... (possivel instabilidade de rede)",
+}
+
+
+def _handle_retry(
+    attempt: int,
+    max_attempts: int,
+    error: subprocess.SubprocessError,
+    ctx: ExecutionContext,
+    kind: str,
+) -> float | None:
+    """Registra a falha de uma tentativa e calcula a espera antes da proxima.
+
+    `kind` e "timeout" ou "failed". Retorna o atraso em segundos (o chamador
+    decide como dormir: time.sleep ou asyncio.sleep) ou None quando nao ha mais
+    tentativas.
+    """
+    if kind == "timeout":
+        msg = f"Comando timeout apos {ctx.timeout}s (tentativa {attempt}/{max_attempts})"
+        logger.warning(msg)
+        ctx.warnings.append(msg)
+    else:
+        msg = f"Comando falhou com codigo {error.returncode} (tentativa {attempt}/{max_attempts})"
+        logger.error("%s: %s", msg, error.stderr or error.output or "")
+
+    if attempt >= max_attempts:
+        if kind != "timeout":
+            ctx.errors.append(msg)
+        return None
+
+    delay = _backoff_delay(ctx, attempt)
+    typer.secho(_RETRY_PROMPTS[kind].format(delay=delay), fg=typer.colors.YELLOW)
+    return delay
 
 
 def run_cmd(
@@ -135,74 +485,71 @@ def run_cmd(
     mask_output: bool = False,
     display_override: str | None = None,
     retries: int | None = None,
+    stream_output: bool = False,
 ) -> subprocess.CompletedProcess:
     """Executa comando exibindo (ou mascarando) a linha usada.
 
     Quando `dry_run` esta ativo, apenas mostra a linha sem executar.
     Suporta retry automatico para comandos que podem falhar temporariamente.
+    Com `stream_output`, a saida (stdout+stderr) e exibida ao vivo e so o final
+    fica em memoria; indicado para comandos verbosos como apt-get e helm.
+    Com `mask_output`, stdout/stderr sao descartados e o resultado volta sem saida.
     """
 
-    display = display_override or _format_cmd(cmd)
     prefix = "[dry-run] " if ctx.dry_run else ""
     if mask_output:
         logger.info("Executando comando com argumentos sensiveis (masked)")
         typer.echo(f"{prefix}[masked] comando executado (argumentos sensiveis ocultos)")
     else:
-        logger.info(f"Executando: {display}")
+        # display_override dispensa re-quotar; o logger so formata se algum handler aceitar
+        display = display_override or _format_cmd(cmd)
+        logger.info("Executando: %s", display)
         typer.echo(f"{prefix}$ {display}")
 
     if ctx.dry_run:
         return subprocess.CompletedProcess(args=cmd, returncode=0)
 
-    merged_env: MutableMapping[str, str] = os.environ.copy()
-    if env:
-        merged_env.update(env)
+    # Sem overrides, o snapshot e repassado direto (Popen nao altera o mapping)
+    merged_env: Mapping[str, str] = {**_BASE_ENV, **env} if env else _BASE_ENV
 
     max_attempts = retries if retries is not None else (ctx.max_retries if check else 1)
     last_error = None
+    # Saida de comando mascarado nunca e lida: descartar evita manter segredos em memoria
+    output_pipe = subprocess.DEVNULL if mask_output else subprocess.PIPE
 
     for attempt in range(1, max_attempts + 1):
         try:
-            result = subprocess.run(
-                cmd,
-                shell=use_shell,
-                check=check,
-                cwd=cwd,
-                env=merged_env,
-                timeout=ctx.timeout,
-                capture_output=True,
-                text=True,
-            )
+            if stream_output and not mask_output:
+                result = _run_streaming(
+                    cmd,
+                    shell=use_shell,
+                    cwd=cwd,
+                    env=merged_env,
+                    timeout=ctx.timeout,
+                    check=check,
+                    echo=True,
+                )
+            else:
+                result = subprocess.run(
+                    cmd,
+                    shell=use_shell,
+                    check=check,
+                    cwd=cwd,
+                    env=merged_env,
+                    timeout=ctx.timeout,
+                    stdout=output_pipe,
+                    stderr=output_pipe,
+                    text=True,
+                )
             if result.returncode == 0 or not check:
                 return result
-        except subprocess.TimeoutExpired as e:
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
             last_error = e
-            msg = f"Comando timeout apos {ctx.timeout}s (tentativa {attempt}/{max_attempts})"
-            logger.warning(msg)
-            ctx.warnings.append(msg)
-            if attempt < max_attempts:
-                backoff_delay = int(ctx.retry_delay * (ctx.retry_backoff ** (attempt - 1)))
-                typer.secho(
-                    f"Timeout! Aguardando {backoff_delay}s antes de tentar novamente...",
-                    fg=typer.colors.YELLOW,
-                )
-                time.sleep(backoff_delay)
-        except subprocess.CalledProcessError as e:
-            last_error = e
-            msg = f"Comando falhou com codigo {e.returncode} (tentativa {attempt}/{max_attempts})"
-            logger.error(f"{msg}: {e.stderr if hasattr(e, 'stderr') else ''}")
-            if attempt < max_attempts:
-                # Exponential backoff: delay * backoff^(attempt-1)
-                backoff_delay = int(ctx.retry_delay * (ctx.retry_backoff ** (attempt - 1)))
-                typer.secho(
-                    f"Tentando novamente em {backoff_delay}s... (possivel instabilidade de rede)",
-                    fg=typer.colors.YELLOW,
-                )
-                time.sleep(backoff_delay)
-            else:
-                ctx.errors.append(msg)
-                if check:
-                    raise
+            kind = "timeout" if isinstance(e, subprocess.TimeoutExpired) else "failed"
+            delay = _handle_retry(attempt, max_attempts, e, ctx, kind)
+            if delay is None:
+                break
+            time.sleep(delay)
         except Exception as e:
             last_error = e
             msg = f"Erro inesperado: {type(e).__name__}: {e}"
@@ -217,6 +564,87 @@ def run_cmd(
     return subprocess.CompletedProcess(args=cmd, returncode=1)
 
 
+async def run_cmd_async(
+    cmd: Sequence[str],
+    ctx: ExecutionContext,
+    *,
+    env: Mapping[str, str] | None = None,
+    cwd: str | None = None,
+    check: bool = True,
+    retries: int | None = None,
+) -> subprocess.CompletedProcess:
+    """Versao assincrona de `run_cmd` sobre asyncio.create_subprocess_exec.
+
+    Mesma semantica de dry-run, timeout e retry com backoff; permite disparar
+    varios comandos independentes (helm/kubectl) ao mesmo tempo com
+    `run_concurrently`. Aceita apenas comandos em lista (sem shell).
+    """
+
+    display = _format_cmd(cmd)
+    logger.info("Executando: %s", display)
+    typer.echo(f"{'[dry-run] ' if ctx.dry_run else ''}$ {display}")
+
+    if ctx.dry_run:
+        return subprocess.CompletedProcess(args=cmd, returncode=0)
+
+    merged_env: Mapping[str, str] = {**_BASE_ENV, **env} if env else _BASE_ENV
+    max_attempts = retries if retries is not None else (ctx.max_retries if check else 1)
+    last_error: subprocess.SubprocessError | None = None
+
+    for attempt in range(1, max_attempts + 1):
+        proc = await asyncio.create_subprocess_exec(
+            *map(str, cmd),
+            cwd=cwd,
+            env=merged_env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=ctx.timeout)
+        except asyncio.TimeoutError:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            last_error = subprocess.TimeoutExpired(cmd, ctx.timeout)
+            kind = "timeout"
+        else:
+            result = subprocess.CompletedProcess(
+                cmd,
+                proc.returncode,
+                stdout.decode(errors="replace"),
+                stderr.decode(errors="replace"),
+            )
+            if result.returncode == 0 or not check:
+                return result
+            last_error = subprocess.CalledProcessError(
+                result.returncode, cmd, output=result.stdout, stderr=result.stderr
+            )
+            kind = "failed"
+
+        delay = _handle_retry(attempt, max_attempts, last_error, ctx, kind)
+        if delay is None:
+            break
+        await asyncio.sleep(delay)
+
+    if check and last_error:
+        raise last_error
+
+    return subprocess.CompletedProcess(args=cmd, returncode=1)
+
+
+def run_concurrently(*aws: Awaitable) -> list:
+    """Executa corrotinas independentes em paralelo e devolve os resultados.
+
+    Ponto de entrada sincrono para os modulos: o tempo total passa a ser o da
+    operacao mais lenta em vez da soma. A primeira excecao e propagada.
+    """
+
+    async def _gather() -> list:
+        return list(await asyncio.gather(*aws))
+
+    return asyncio.run(_gather())
+
+
 def require_root(ctx: ExecutionContext) -> None:
     """Encerra se o usuario atual nao for root."""
 
@@ -228,53 +656,102 @@ def require_root(ctx: ExecutionContext) -> None:
         raise typer.Exit(code=1)
 
 
+@functools.lru_cache(maxsize=64)
+def _find_tool(name: str, path: str) -> str | None:
+    """Caminho do executavel `name` no PATH, parando no primeiro acerto.
+
+    Memoizado por (nome, PATH). So precisamos do primeiro acerto: dispensa o
+    tratamento de PATHEXT e as listas intermediarias do shutil.which.
+    """
+    if os.sep in name:
+        return name if os.access(name, os.X_OK) and not os.path.isdir(name) else None
+    for directory in path.split(os.pathsep):
+        candidate = os.path.join(directory or ".", name)
+        if os.access(candidate, os.X_OK) and not os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def _tool_exists(name: str, path: str) -> bool:
+    """Consulta o cache e confirma o acerto com um unico os.access.
+
+    Binarios podem ser removidos no meio da sessao (ex.: sanitize apaga
+    /usr/local/bin/helm); acertos vencidos e ausencias sao revarridos.
+    """
+    found = _find_tool(name, path)
+    if found is not None and os.access(found, os.X_OK):
+        return True
+    _find_tool.cache_clear()
+    return _find_tool(name, path) is not None
+
+
 def ensure_tool(name: str, ctx: ExecutionContext, install_hint: str = "") -> None:
     """Valida que um binario esta disponivel no PATH (ignora quando dry-run)."""
 
     if ctx.dry_run:
         return
-    if shutil.which(name) is None:
+    if not _tool_exists(name, os.environ.get("PATH", "")):
         hint = f" {install_hint}" if install_hint else ""
         typer.secho(f"Ferramenta '{name}' nao encontrada.{hint}", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
 
+APT_SOURCES_LIST = Path("/etc/apt/sources.list")
+APT_SOURCES_DIR = Path("/etc/apt/sources.list.d")
+APT_SOURCES_BACKUP_DIR = Path("/var/backups/raijin-server/apt-sources")
+_BR_MIRROR_RE = re.compile(r"br\.(archive|ports)\.ubuntu\.com")
+
+
+def _fix_apt_source_file(path: Path) -> bool:
+    """Troca mirrors brasileiros pelo principal em um arquivo de fontes APT.
+
+    Uma unica passada de regex; o arquivo so e reescrito (com backup .bak,
+    em /var/backups para arquivos de sources.list.d) quando ha substituicao. Retorna True se o arquivo foi alterado.
+    """
+    content = path.read_text()
+    new_content, count = _BR_MIRROR_RE.subn(r"\1.ubuntu.com", content)
+    if not count:
+        return False
+
+    # Backups dentro de sources.list.d fariam o apt avisar "invalid filename
+    # extension" a cada update; ficam em /var/backups
+    if path.parent == APT_SOURCES_DIR:
+        APT_SOURCES_BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        backup = APT_SOURCES_BACKUP_DIR / (path.name + ".bak")
+    else:
+        backup = path.with_name(path.name + ".bak")
+    if not backup.exists():
+        shutil.copy2(path, backup)
+    path.write_text(new_content)
+    return True
+
+
 def _fix_broken_apt_sources(ctx: ExecutionContext) -> None:
     """Corrige repositórios APT quebrados (mirrors brasileiros problemáticos)."""
     if ctx.dry_run:
         typer.echo("[dry-run] Verificando/corrigindo repositórios APT...")
         return
 
-    sources_list = Path("/etc/apt/sources.list")
-
-    # Detecta se está usando mirror brasileiro quebrado
-    needs_fix = False
-    if sources_list.exists():
-        content = sources_list.read_text()
-        if "br.archive.ubuntu.com" in content or "br.ports.ubuntu.com" in content:
-            needs_fix = True
+    # sources.list classico + arquivos .list/.sources (deb822, padrao no 24.04)
+    candidates = [APT_SOURCES_LIST] if APT_SOURCES_LIST.is_file() else []
+    if APT_SOURCES_DIR.is_dir():
+        with os.scandir(APT_SOURCES_DIR) as entries:
+            candidates.extend(
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file() and entry.name.endswith((".list", ".sources"))
+            )
 
-    if not needs_fix:
+    fixed = [path for path in candidates if _fix_apt_source_file(path)]
+    if not fixed:
         return
 
     typer.secho(
-        "⚠ Detectado mirror brasileiro possivelmente quebrado. Corrigindo...",
+        "⚠ Detectado mirror brasileiro possivelmente quebrado. Corrigido.",
         fg=typer.colors.YELLOW,
     )
-    logger.warning("Corrigindo mirror brasileiro quebrado em sources.list")
-
-    # Backup do original
-    backup = sources_list.with_suffix(".list.bak")
-    if not backup.exists():
-        import shutil as sh
-        sh.copy2(sources_list, backup)
-
-    # Substitui mirror brasileiro pelo principal
-    new_content = content.replace("br.archive.ubuntu.com", "archive.ubuntu.com")
-    new_content = new_content.replace("br.ports.ubuntu.com", "ports.ubuntu.com")
-    sources_list.write_text(new_content)
-
-    typer.secho("✓ Repositórios corrigidos (backup em sources.list.bak)", fg=typer.colors.GREEN)
+    logger.warning("Corrigido mirror brasileiro quebrado em: %s", ", ".join(map(str, fixed)))
+    typer.secho("✓ Repositórios corrigidos (backup em <arquivo>.bak)", fg=typer.colors.GREEN)
 
 
 def apt_update(ctx: ExecutionContext) -> None:
@@ -283,33 +760,71 @@ def apt_update(ctx: ExecutionContext) -> None:
 
     # Tenta o update; se falhar com erro de Release, tenta corrigir
     try:
-        run_cmd(["apt-get", "update"], ctx, retries=2)
+        run_cmd(["apt-get", "update"], ctx, retries=2, stream_output=True)
     except Exception as e:
-        error_msg = str(e).lower()
+        error_msg = f"{e} {getattr(e, 'output', '') or ''}".lower()
         if "release" in error_msg or "no longer has" in error_msg:
             typer.secho(
                 "⚠ Erro de repositório detectado. Tentando fallback...",
                 fg=typer.colors.YELLOW,
             )
             # Força correção e tenta novamente
-            ctx_temp = ExecutionContext(dry_run=False)
+            ctx_temp = replace(ctx, dry_run=False)
             _fix_broken_apt_sources(ctx_temp)
-            run_cmd(["apt-get", "update"], ctx)
+            run_cmd(["apt-get", "update"], ctx, stream_output=True)
         else:
             raise
 
 
-def apt_install(packages: Iterable[str], ctx: ExecutionContext) -> None:
-    pkgs = list(packages)
-    if not pkgs:
+def _installed_packages() -> set[str]:
+    """Conjunto de pacotes instalados (status "ii") segundo o dpkg.
+
+    Consultado a cada instalacao (nao por sessao): modulos como sanitize
+    removem pacotes via apt-get purge no meio da mesma execucao.
+    """
+    try:
+        result = subprocess.run(
+            ["dpkg-query", "-W", "-f=${db:Status-Abbrev} ${Package}\n"],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except Exception:
+        return set()
+    return {
+        line.split()[1]
+        for line in result.stdout.splitlines()
+        if line.startswith("ii") and len(line.split()) > 1
+    }
+
+
+def _apt_install_now(pkgs: list[str], ctx: ExecutionContext) -> None:
+    # Em dry-run nada e consultado: a linha exibida e a do pedido completo
+    installed = set() if ctx.dry_run else _installed_packages()
+    # Pacotes com versao fixada (pkg=1.2) sempre seguem para o apt-get
+    missing = [pkg for pkg in pkgs if pkg not in installed]
+    skipped = [pkg for pkg in pkgs if pkg in installed]
+    if skipped:
+        # apt-get install nao sera chamado para estes: eles nao sao atualizados
+        typer.echo(f"Pacotes ja instalados (mantidos na versao atual): {' '.join(skipped)}")
+    if not missing:
         return
     run_cmd(
-        ["apt-get", "install", "-y", *pkgs],
+        ["apt-get", "install", "-y", *missing],
         ctx,
         env={"DEBIAN_FRONTEND": "noninteractive"},
+        stream_output=True,
     )
 
 
+def apt_install(packages: Iterable[str], ctx: ExecutionContext) -> None:
+    # dict.fromkeys deduplica mantendo a ordem pedida
+    pkgs = list(dict.fromkeys(packages))
+    if not pkgs:
+        return
+    _apt_install_now(pkgs, ctx)
+
+
 def enable_service(name: str, ctx: ExecutionContext) -> None:
     run_cmd(["systemctl", "enable", "--now", name], ctx)
 
@@ -335,39 +850,90 @@ def helm_repo_update(ctx: ExecutionContext) -> None:
     run_cmd(["helm", "repo", "update"], ctx)
 
 
+class _HelmStateCache:
+    """Cache de curta duracao para consultas `helm status`/`helm history`.
+
+    Dentro de uma mesma decisao de limpeza o estado do release nao muda ate que
+    uma acao (rollback/uninstall/limpeza forcada) seja executada; quem executa a
+    acao chama `invalidate` antes de consultar de novo.
+    """
+
+    def __init__(self, ttl: float = 2.0) -> None:
+        self.ttl = ttl
+        self._entries: dict[tuple[str, str, str], tuple[float, object]] = {}
+
+    def get(self, kind: str, release: str, namespace: str):
+        entry = self._entries.get((kind, release, namespace))
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def set(self, kind: str, release: str, namespace: str, value: object) -> None:
+        self._entries[(kind, release, namespace)] = (time.monotonic(), value)
+
+    def invalidate(self, release: str, namespace: str) -> None:
+        for key in [k for k in self._entries if k[1:] == (release, namespace)]:
+            del self._entries[key]
+
+
+_helm_state_cache = _HelmStateCache()
+
+
 def _get_helm_release_status(release: str, namespace: str) -> str:
     """Retorna status do release Helm (lowercased) ou string vazia se nao existir."""
+    cached = _helm_state_cache.get("status", release, namespace)
+    if cached is not None:
+        return cached
+    status = ""
     try:
-        import json
+        # json.loads aceita bytes: evita decodificar a saida inteira antes do parse
         result = subprocess.run(
             ["helm", "status", release, "-n", namespace, "-o", "json"],
             capture_output=True,
-            text=True,
             timeout=30,
         )
-        if result.returncode != 0 or not result.stdout:
-            return ""
-        data = json.loads(result.stdout)
-        return str(data.get("info", {}).get("status", "")).lower()
+        if result.returncode == 0 and result.stdout:
+            data = json.loads(result.stdout)
+            status = str(data.get("info", {}).get("status", "")).lower()
     except Exception:
         return ""
+    _helm_state_cache.set("status", release, namespace, status)
+    return status
 
 
 def _get_helm_release_history(release: str, namespace: str) -> list:
     """Retorna histórico do release Helm."""
+    cached = _helm_state_cache.get("history", release, namespace)
+    if cached is not None:
+        return cached
+    history: list = []
     try:
-        import json
+        # json.loads aceita bytes: evita decodificar a saida inteira antes do parse
         result = subprocess.run(
             ["helm", "history", release, "-n", namespace, "-o", "json"],
             capture_output=True,
-            text=True,
             timeout=30,
         )
-        if result.returncode != 0 or not result.stdout:
-            return []
-        return json.loads(result.stdout)
+        if result.returncode == 0 and result.stdout:
+            history = json.loads(result.stdout)
+    except Exception:
+        return []
+    _helm_state_cache.set("history", release, namespace, history)
+    return history
+
+
+def _list_helm_release_secrets(release: str, namespace: str) -> list[str]:
+    """Lista secrets (`secret/<nome>`) onde o Helm guarda o estado do release."""
+    try:
+        result = subprocess.run(
+            ["kubectl", "get", "secrets", "-n", namespace, "-l", f"name={release},owner=helm", "-o", "name"],
+            capture_output=True,
+            text=True,
+            timeout=15,
+        )
     except Exception:
         return []
+    return result.stdout.strip().split("\n") if result.stdout.strip() else []
 
 
 def _diagnose_helm_release(release: str, namespace: str) -> None:
@@ -386,20 +952,11 @@ def _diagnose_helm_release(release: str, namespace: str) -> None:
             typer.echo(f"    Rev {rev.get('revision')}: {rev.get('status')} - {rev.get('description', '')[:50]}")
     
     # Secrets do Helm (onde guarda estado)
-    try:
-        result = subprocess.run(
-            ["kubectl", "get", "secrets", "-n", namespace, "-l", f"name={release},owner=helm", "-o", "name"],
-            capture_output=True,
-            text=True,
-            timeout=15,
-        )
-        if result.stdout.strip():
-            secrets = result.stdout.strip().split("\n")
-            typer.echo(f"  Secrets do Helm: {len(secrets)}")
-            for s in secrets[-5:]:
-                typer.echo(f"    {s}")
-    except Exception:
-        pass
+    secrets = _list_helm_release_secrets(release, namespace)
+    if secrets:
+        typer.echo(f"  Secrets do Helm: {len(secrets)}")
+        for s in secrets[-5:]:
+            typer.echo(f"    {s}")
     
     # Pods relacionados
     try:
@@ -431,6 +988,7 @@ def _force_cleanup_helm_release(release: str, namespace: str) -> bool:
             timeout=150,
         )
         
+        _helm_state_cache.invalidate(release, namespace)
         if result.returncode == 0:
             typer.secho(f"  ✓ Release removido via helm uninstall", fg=typer.colors.GREEN)
             time.sleep(3)
@@ -440,25 +998,24 @@ def _force_cleanup_helm_release(release: str, namespace: str) -> bool:
         typer.echo("  Helm uninstall falhou, removendo secrets diretamente...")
         logger.warning("Removendo secrets do Helm diretamente")
         
-        # Lista secrets do Helm para este release
-        result = subprocess.run(
-            ["kubectl", "get", "secrets", "-n", namespace, "-l", f"name={release},owner=helm", "-o", "name"],
-            capture_output=True,
-            text=True,
-            timeout=15,
-        )
+        # Lista os secrets so agora: rollback/uninstall anteriores podem ter gravado novas revisoes
+        secrets = _list_helm_release_secrets(release, namespace)
         
-        if result.stdout.strip():
-            secrets = result.stdout.strip().split("\n")
-            for secret in secrets:
-                secret_name = secret.replace("secret/", "")
-                subprocess.run(
-                    ["kubectl", "delete", "secret", secret_name, "-n", namespace],
-                    capture_output=True,
-                    timeout=30,
-                )
-                typer.echo(f"    Removido: {secret_name}")
+        if secrets:
+            # Uma unica chamada para todos os secrets (kubectl aceita varios nomes)
+            secret_names = [secret.replace("secret/", "") for secret in secrets]
+            result = subprocess.run(
+                ["kubectl", "delete", "secret", *secret_names, "-n", namespace, "--ignore-not-found", "--wait=false"],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+            if result.returncode != 0:
+                logger.warning(f"Falha ao remover secrets do Helm: {result.stderr.strip()}")
+            for line in result.stdout.strip().splitlines():
+                typer.echo(f"    {line}")
             
+            _helm_state_cache.invalidate(release, namespace)
             time.sleep(3)
             typer.secho(f"  ✓ Secrets do Helm removidos", fg=typer.colors.GREEN)
             return True
@@ -505,6 +1062,7 @@ def _cleanup_pending_helm_release(release: str, namespace: str, ctx: ExecutionCo
             timeout=150,
         )
         
+        _helm_state_cache.invalidate(release, namespace)
         if result.returncode == 0:
             new_status = _get_helm_release_status(release, namespace)
             if not new_status.startswith("pending"):
@@ -521,6 +1079,7 @@ def _cleanup_pending_helm_release(release: str, namespace: str, ctx: ExecutionCo
         text=True,
         timeout=200,
     )
+    _helm_state_cache.invalidate(release, namespace)
     
     if result.returncode == 0:
         typer.secho(f"  ✓ Release removido com sucesso", fg=typer.colors.GREEN)
@@ -577,17 +1136,18 @@ def helm_upgrade_install(
         cmd.extend(extra_args)
     
     try:
-        run_cmd(cmd, ctx)
+        run_cmd(cmd, ctx, stream_output=True)
     except Exception as e:
-        err_text = str(e).lower()
+        err_text = f"{e} {getattr(e, 'output', '') or ''}".lower()
         # Se falhou por operacao em progresso, tenta limpar e reinstalar uma vez
         if "another operation" in err_text and "in progress" in err_text:
             typer.secho(
                 f"⚠ Helm detectou operacao pendente em '{release}'. Limpando e tentando novamente...",
                 fg=typer.colors.YELLOW,
             )
+            _helm_state_cache.invalidate(release, namespace)
             _cleanup_pending_helm_release(release, namespace, ctx)
-            run_cmd(cmd, ctx)
+            run_cmd(cmd, ctx, stream_output=True)
         else:
             raise
 
@@ -2,43 +2,74 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import platform
 import shutil
+import socket
+import struct
 import subprocess
 import sys
-import urllib.request
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import Callable, FrozenSet, List, Mapping, Tuple
 
 import typer
 
 from raijin_server.utils import ExecutionContext, logger
 
-# Grafo de dependencias entre modulos (usado por validacoes e funcoes de rollback)
-MODULE_DEPENDENCIES = {
-    "kubernetes": ["essentials", "network", "firewall"],
-    "calico": ["kubernetes"],
-    "metallb": ["kubernetes"],
-    "cert_manager": ["kubernetes", "traefik"],
-    "istio": ["kubernetes", "calico"],
-    "traefik": ["kubernetes"],
-    "kong": ["kubernetes"],
-    "minio": ["kubernetes"],
-    "prometheus": ["kubernetes"],
-    "grafana": ["kubernetes", "prometheus"],
-    "loki": ["kubernetes"],
-    "secrets": ["kubernetes", "minio"],
-    "harbor": ["kubernetes", "minio"],
-    "argo": ["kubernetes"],
-    "velero": ["kubernetes", "minio"],
-    "supabase": ["kubernetes", "traefik", "cert_manager"],
-    "gitops": ["kubernetes", "argo"],
-    "landing": ["kubernetes", "traefik"],
-    "observability_ingress": ["traefik", "prometheus", "grafana"],
-    "observability_dashboards": ["prometheus", "grafana"],
-
-}
+# Espera maxima (s) por resposta de cada ping; ajustavel por operadores em redes lentas
+CONNECTIVITY_TIMEOUT = float(os.environ.get("RAIJIN_PING_TIMEOUT", "1.0"))
+CONNECTIVITY_PING_COUNT = int(os.environ.get("RAIJIN_PING_COUNT", "1"))
+CONNECTIVITY_TCP_TARGET = ("1.1.1.1", 443)
+# Rede pode mudar durante a sessao: resultado de conectividade vale por pouco tempo
+CONNECTIVITY_CACHE_TTL = 60.0
+_CONNECTIVITY_CACHE: dict[tuple, tuple[float, Tuple[bool, str]]] = {}
+# Marcador (no diretorio de estado) de validacao bem-sucedida e sua validade em segundos
+VALIDATION_MARKER = ".validation_ok"
+VALIDATION_MARKER_TTL = 3600
+
+# Grafo de dependencias entre modulos (usado por validacoes e funcoes de rollback).
+# Imutavel: o indice reverso e os fechos transitivos sao derivados dele uma unica vez.
+MODULE_DEPENDENCIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "kubernetes": ("essentials", "network", "firewall"),
+    "calico": ("kubernetes",),
+    "metallb": ("kubernetes",),
+    "cert_manager": ("kubernetes", "traefik"),
+    "istio": ("kubernetes", "calico"),
+    "traefik": ("kubernetes",),
+    "kong": ("kubernetes",),
+    "minio": ("kubernetes",),
+    "prometheus": ("kubernetes",),
+    "grafana": ("kubernetes", "prometheus"),
+    "loki": ("kubernetes",),
+    "secrets": ("kubernetes", "minio"),
+    "harbor": ("kubernetes", "minio"),
+    "argo": ("kubernetes",),
+    "velero": ("kubernetes", "minio"),
+    "supabase": ("kubernetes", "traefik", "cert_manager"),
+    "gitops": ("kubernetes", "argo"),
+    "landing": ("kubernetes", "traefik"),
+    "observability_ingress": ("traefik", "prometheus", "grafana"),
+    "observability_dashboards": ("prometheus", "grafana"),
+})
+
+# Indice reverso: modulo -> modulos que dependem diretamente dele (ordem de declaracao)
+_REVERSE_DEPENDENCIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    dep: tuple(mod for mod, deps in MODULE_DEPENDENCIES.items() if dep in deps)
+    for dep in {dep for deps in MODULE_DEPENDENCIES.values() for dep in deps}
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _transitive_dependents(module: str) -> FrozenSet[str]:
+    """Modulos que dependem de `module`, direta ou indiretamente."""
+    result = set(_REVERSE_DEPENDENCIES.get(module, ()))
+    for dependent in _REVERSE_DEPENDENCIES.get(module, ()):
+        result |= _transitive_dependents(dependent)
+    return frozenset(result)
 
 
 class ValidationError(Exception):
@@ -47,54 +78,73 @@ class ValidationError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=None)
+def _os_release() -> dict:
+    """Campos de /etc/os-release (CHAVE -> valor sem aspas), lidos uma unica vez."""
+    with open("/etc/os-release") as f:
+        return _parse_os_release(f.read())
+
+
+def _parse_os_release(content: str) -> dict:
+    # Uma passada so: CHAVE=valor por linha, removendo as aspas do valor
+    pairs = (line.split("=", 1) for line in content.splitlines() if "=" in line and not line.startswith("#"))
+    return {key.strip(): value.strip().strip("\"'") for key, value in pairs}
+
+
+@functools.lru_cache(maxsize=None)
 def check_os_version() -> Tuple[bool, str]:
     """Valida se o OS e Ubuntu Server 24.04 ou compativel."""
     try:
         if platform.system() != "Linux":
             return False, f"Sistema operacional nao suportado: {platform.system()}"
 
-        # Verifica /etc/os-release
-        os_release = Path("/etc/os-release")
-        if not os_release.exists():
+        # Abre /etc/os-release direto; a ausencia aparece como FileNotFoundError
+        try:
+            info = _os_release()
+        except FileNotFoundError:
             return False, "Arquivo /etc/os-release nao encontrado"
 
-        content = os_release.read_text()
-        is_ubuntu = "ubuntu" in content.lower()
-
-        if not is_ubuntu:
+        # Derivados (ID_LIKE=ubuntu) continuam aceitos
+        if info.get("ID") != "ubuntu" and "ubuntu" not in info.get("ID_LIKE", "").split():
             return False, "Sistema nao e Ubuntu"
 
         # Extrai versao
-        version_line = [line for line in content.split("\n") if line.startswith("VERSION_ID=")]
-        if version_line:
-            version = version_line[0].split("=")[1].strip('"')
-            version_major = float(version.split(".")[0])
+        version = info.get("VERSION_ID")
+        if version is not None:
+            try:
+                version_major = int(version.split(".", 1)[0])
+            except ValueError:
+                # VERSION_ID fora do padrao (ex.: builds customizados): nao bloqueia
+                return True, f"Ubuntu detectado: {version} (versao nao numerica)"
             if version_major < 20:
                 return False, f"Ubuntu {version} muito antigo (minimo: 20.04)"
 
-        return True, f"Ubuntu detectado: {version if version_line else 'versao desconhecida'}"
+        return True, f"Ubuntu detectado: {version if version is not None else 'versao desconhecida'}"
     except Exception as e:
         return False, f"Erro ao verificar OS: {e}"
 
 
+@functools.lru_cache(maxsize=None)
 def check_disk_space(min_gb: int = 20) -> Tuple[bool, str]:
     """Verifica espaco em disco disponivel."""
     try:
-        stat = os.statvfs("/")
-        free_gb = (stat.f_bavail * stat.f_frsize) / (1024**3)
-        if free_gb < min_gb:
+        free = shutil.disk_usage("/").free
+        free_gb = free / (1 << 30)
+        # Comparacao inteira em bytes; o float so e usado na mensagem
+        if free < min_gb << 30:
             return False, f"Espaco insuficiente: {free_gb:.1f}GB (minimo: {min_gb}GB)"
         return True, f"Espaco em disco OK: {free_gb:.1f}GB disponiveis"
     except Exception as e:
         return False, f"Erro ao verificar disco: {e}"
 
 
+@functools.lru_cache(maxsize=None)
 def check_memory(min_gb: int = 4) -> Tuple[bool, str]:
     """Verifica memoria RAM disponivel."""
     try:
+        # MemTotal e a primeira linha de /proc/meminfo; para no primeiro acerto
         with open("/proc/meminfo") as f:
-            meminfo = f.read()
-        mem_total_kb = int([line for line in meminfo.split("\n") if "MemTotal" in line][0].split()[1])
+            mem_total_kb = next(int(line.split()[1]) for line in f if line.startswith("MemTotal:"))
         mem_total_gb = mem_total_kb / (1024**2)
         if mem_total_gb < min_gb:
             return False, f"Memoria insuficiente: {mem_total_gb:.1f}GB (minimo: {min_gb}GB)"
@@ -103,31 +153,153 @@ def check_memory(min_gb: int = 4) -> Tuple[bool, str]:
         return False, f"Erro ao verificar memoria: {e}"
 
 
-def check_connectivity(hosts: List[str] | None = None) -> Tuple[bool, str]:
-    """Verifica conectividade com internet via ICMP e HTTP."""
-    if hosts is None:
-        hosts = ["8.8.8.8", "1.1.1.1"]
+def _fping_any(hosts: List[str], count: int, per_host_timeout: float) -> str | None:
+    """Testa todos os hosts com um unico processo fping; retorna o primeiro vivo."""
+    result = subprocess.run(
+        ["fping", "-a", "-q", "-r", str(count - 1), "-t", str(int(per_host_timeout * 1000)), *hosts],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        timeout=per_host_timeout * count + 1,
+    )
+    alive = result.stdout.split()
+    return alive[0] if alive else None
+
+
+def _icmp_socket_any(hosts: List[str], count: int, per_host_timeout: float) -> str | None:
+    """Echo ICMP por socket datagrama (sem processo); retorna o primeiro host que responder.
 
-    # Primeiro tenta ICMP
+    Exige que o gid do usuario esteja em net.ipv4.ping_group_range; caso
+    contrario levanta PermissionError e o chamador recorre ao ping.
+    """
+    addresses = {}
     for host in hosts:
         try:
-            result = subprocess.run(
-                ["ping", "-c", "1", "-W", "2", host],
-                capture_output=True,
-                timeout=5,
+            addresses[socket.gethostbyname(host)] = host
+        except OSError:
+            continue
+    if not addresses:
+        return None
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP) as sock:
+        for seq in range(count):
+            # Echo request; em sockets de ping o kernel preenche id e checksum
+            packet = struct.pack("!BBHHH", 8, 0, 0, 0, seq) + b"raijin"
+            for address in addresses:
+                sock.sendto(packet, (address, 0))
+        deadline = time.monotonic() + per_host_timeout + (count - 1)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            sock.settimeout(remaining)
+            try:
+                data, (address, _) = sock.recvfrom(1024)
+            except socket.timeout:
+                return None
+            if data and data[0] == 0 and address in addresses:  # echo reply
+                return addresses[address]
+
+
+def _ping_any(hosts: List[str], count: int, per_host_timeout: float) -> str | None:
+    """Retorna o primeiro host que responder a ICMP, usando o meio mais barato.
+
+    Ordem: fping (um processo para todos os hosts), socket ICMP sem privilegio
+    e, por fim, um processo ping por host.
+    """
+    if "fping" in _path_executables(os.environ.get("PATH", os.defpath)):
+        try:
+            return _fping_any(hosts, count, per_host_timeout)
+        except (OSError, subprocess.SubprocessError):
+            pass
+    try:
+        return _icmp_socket_any(hosts, count, per_host_timeout)
+    except OSError:
+        pass
+    return _ping_processes_any(hosts, count, per_host_timeout)
+
+
+def _ping_processes_any(hosts: List[str], count: int, per_host_timeout: float) -> str | None:
+    """Dispara um ping por host simultaneamente e retorna o primeiro que responder.
+
+    Assim que um host responde, os pings restantes sao encerrados.
+    """
+    procs = {}
+    for host in hosts:
+        try:
+            procs[host] = subprocess.Popen(
+                ["ping", "-c", str(count), "-W", f"{per_host_timeout:g}", host],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             )
-            if result.returncode == 0:
-                return True, f"Conectividade OK (testado: {host})"
-        except Exception:
+        except OSError:
             continue
+    if not procs:
+        return None
+
+    # Margem para o intervalo de 1s entre pacotes quando count > 1
+    wait_timeout = per_host_timeout + (count - 1) + 0.5
+
+    def _wait(host: str) -> Tuple[str, bool]:
+        try:
+            return host, procs[host].wait(timeout=wait_timeout) == 0
+        except subprocess.TimeoutExpired:
+            return host, False
+
+    reachable = None
+    pool = ThreadPoolExecutor(max_workers=len(procs))
+    try:
+        for future in as_completed([pool.submit(_wait, host) for host in procs]):
+            host, ok = future.result()
+            if ok:
+                reachable = host
+                break
+    finally:
+        # Encerra os pings pendentes antes de aguardar as threads
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.kill()
+        pool.shutdown(wait=True)
+        for proc in procs.values():
+            proc.wait()
+    return reachable
+
+
+def check_connectivity(
+    hosts: List[str] | None = None,
+    *,
+    count: int = CONNECTIVITY_PING_COUNT,
+    timeout: float = CONNECTIVITY_TIMEOUT,
+) -> Tuple[bool, str]:
+    """Verifica conectividade com internet via ICMP e TCP.
+
+    `count` e `timeout` controlam os pacotes por host e a espera (s) por resposta.
+    """
+    if hosts is None:
+        hosts = ["8.8.8.8", "1.1.1.1"]
+
+    key = (tuple(hosts), count, timeout)
+    cached = _CONNECTIVITY_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < CONNECTIVITY_CACHE_TTL:
+        return cached[1]
+    result = _probe_connectivity(hosts, count, timeout)
+    _CONNECTIVITY_CACHE[key] = (time.monotonic(), result)
+    return result
 
-    # Fallback HTTP (caso ICMP seja bloqueado)
+
+def _probe_connectivity(hosts: List[str], count: int, timeout: float) -> Tuple[bool, str]:
+    # Primeiro tenta ICMP, em paralelo: um host inacessivel nao atrasa os demais
+    reachable = _ping_any(hosts, count, timeout)
+    if reachable:
+        return True, f"Conectividade OK (testado: {reachable})"
+
+    # Fallback TCP (caso ICMP seja bloqueado): o handshake basta, sem TLS/HTTP
+    host, port = CONNECTIVITY_TCP_TARGET
     try:
-        req = urllib.request.Request("https://www.google.com", method="HEAD")
-        with urllib.request.urlopen(req, timeout=5):
-            return True, "Conectividade HTTP OK (https://www.google.com)"
-    except Exception:
-        return False, "Sem conectividade com internet (ICMP e HTTP falharam)"
+        with socket.create_connection(CONNECTIVITY_TCP_TARGET, timeout=2):
+            return True, f"Conectividade TCP OK ({host}:{port})"
+    except OSError:
+        return False, "Sem conectividade com internet (ICMP e TCP falharam)"
 
 
 def check_required_commands(commands: List[str] | None = None) -> Tuple[bool, List[str]]:
@@ -135,25 +307,40 @@ def check_required_commands(commands: List[str] | None = None) -> Tuple[bool, Li
     if commands is None:
         commands = ["curl", "wget", "apt-get", "systemctl"]
 
-    missing = []
-    for cmd in commands:
-        if not shutil.which(cmd):
-            missing.append(cmd)
-
+    executables = _path_executables(os.environ.get("PATH", os.defpath))
+    missing = [cmd for cmd in commands if cmd not in executables]
     if missing:
         return False, missing
     return True, []
 
 
+@functools.lru_cache(maxsize=4)
+def _path_executables(path: str) -> frozenset:
+    """Nomes de arquivos presentes nos diretorios do PATH, varridos uma unica vez.
+
+    Usa o tipo vindo do scandir (sem stat por arquivo, exceto symlinks); nao
+    testa permissao de execucao, suficiente para diretorios de binarios.
+    """
+    names = set()
+    for directory in path.split(os.pathsep):
+        try:
+            with os.scandir(directory or ".") as entries:
+                names.update(entry.name for entry in entries if entry.is_file())
+        except OSError:
+            continue
+    return frozenset(names)
+
+
+@functools.lru_cache(maxsize=None)
 def check_virtualenv() -> Tuple[bool, str]:
     """Valida se a execucao esta dentro de um ambiente isolado (venv/pyenv)."""
 
     in_venv = sys.prefix != sys.base_prefix or os.environ.get("VIRTUAL_ENV")
-    externally_managed = Path(sys.prefix).joinpath("../EXTERNALLY-MANAGED").resolve()
-
     if in_venv:
         return True, "Executando em ambiente virtual"
 
+    # Sem resolve(): o kernel segue os componentes no proprio stat do exists()
+    externally_managed = Path(sys.prefix).joinpath("../EXTERNALLY-MANAGED")
     if externally_managed.exists():
         return False, (
             "Python gerenciado pelo sistema. Crie um venv: "
@@ -175,33 +362,68 @@ def check_is_root() -> Tuple[bool, str]:
     return False, "Usuario nao e root (reexecute com: sudo -E raijin-server ...)"
 
 
-def validate_system_requirements(ctx: ExecutionContext, skip_root: bool = False) -> bool:
+def _check_commands_summary() -> Tuple[bool, str]:
+    """Resultado de `check_required_commands` no formato (ok, mensagem)."""
+    cmd_ok, missing = check_required_commands()
+    if cmd_ok:
+        return True, "Todos os comandos disponiveis"
+    install_hint = "sudo apt-get update && sudo apt-get install -y " + " ".join(missing)
+    return False, f"Faltando: {', '.join(missing)} | Sugestao: {install_hint}"
+
+
+def validate_system_requirements(
+    ctx: ExecutionContext,
+    skip_root: bool = False,
+    abort_on_first_failure: bool = False,
+    force: bool = False,
+) -> bool:
     """Executa todas as validacoes de pre-requisitos.
 
+    Com `abort_on_first_failure`, as checagens rodam em sequencia e param na
+    primeira falha (as mais caras, como conectividade, ficam por ultimo).
+    Uma validacao bem-sucedida ha menos de `VALIDATION_MARKER_TTL` segundos
+    dispensa as checagens (exceto root), a menos que `force` seja informado.
+
     Returns:
         True se todas as validacoes passaram, False caso contrario.
     """
+    # Root continua sendo checado: e barato e pode mudar entre execucoes
+    if not force and _recent_validation_ok():
+        if skip_root or check_is_root()[0]:
+            typer.secho(
+                "✓ Pre-requisitos validados recentemente (use --force-validate para revalidar)",
+                fg=typer.colors.GREEN,
+            )
+            logger.info("Validacao de pre-requisitos reaproveitada do marcador de sucesso")
+            return True
+
     logger.info("Iniciando validacao de pre-requisitos do sistema...")
     typer.secho("\n=== Validacao de Pre-requisitos ===", fg=typer.colors.CYAN, bold=True)
 
-    checks = [
-        ("Ambiente Python", check_virtualenv()),
-        ("Sistema Operacional", check_os_version()),
-        ("Espaco em Disco", check_disk_space()),
-        ("Memoria RAM", check_memory()),
-        ("Conectividade", check_connectivity()),
+    # Lista de funcoes, nao de resultados: nada executa antes de ser necessario
+    probes: List[Tuple[str, Callable[[], Tuple[bool, str]]]] = [
+        ("Ambiente Python", check_virtualenv),
+        ("Sistema Operacional", check_os_version),
+        ("Espaco em Disco", check_disk_space),
+        ("Memoria RAM", check_memory),
+        ("Comandos Essenciais", _check_commands_summary),
+        ("Conectividade", check_connectivity),
     ]
-
     if not skip_root:
-        checks.insert(0, ("Permissoes Root", check_is_root()))
-
-    # Comandos essenciais
-    cmd_ok, missing = check_required_commands()
-    if cmd_ok:
-        checks.append(("Comandos Essenciais", (True, "Todos os comandos disponiveis")))
+        probes.insert(0, ("Permissoes Root", check_is_root))
+
+    if abort_on_first_failure:
+        checks = []
+        for name, probe in probes:
+            checks.append((name, probe()))
+            if not checks[-1][1][0]:
+                break
     else:
-        install_hint = "sudo apt-get update && sudo apt-get install -y " + " ".join(missing)
-        checks.append(("Comandos Essenciais", (False, f"Faltando: {', '.join(missing)} | Sugestao: {install_hint}")))
+        # Checagens independentes (arquivos, syscalls, rede) rodam em paralelo;
+        # o tempo total passa a ser o da mais lenta, em geral a de conectividade
+        with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+            futures = [(name, pool.submit(probe)) for name, probe in probes]
+            checks = [(name, future.result()) for name, future in futures]
 
     all_passed = True
     for name, (passed, message) in checks:
@@ -217,6 +439,8 @@ def validate_system_requirements(ctx: ExecutionContext, skip_root: bool = False)
     typer.echo("")
 
     if not all_passed:
+        # Sucesso anterior nao vale mais: a proxima execucao precisa revalidar
+        _clear_validation_ok()
         if ctx.dry_run:
             typer.secho("⚠ Validacoes falharam, mas continuando em modo dry-run", fg=typer.colors.YELLOW)
             return True
@@ -227,9 +451,65 @@ def validate_system_requirements(ctx: ExecutionContext, skip_root: bool = False)
 
     typer.secho("✓ Todos os pre-requisitos atendidos!", fg=typer.colors.GREEN, bold=True)
     logger.info("Validacao de pre-requisitos concluida com sucesso")
+    _mark_validation_ok()
     return True
 
 
+def _recent_validation_ok() -> bool:
+    """Indica se ha marcador de validacao bem-sucedida dentro do TTL."""
+    try:
+        mtime = (_resolve_state_dir() / VALIDATION_MARKER).stat().st_mtime
+    except OSError:
+        return False
+    return time.time() - mtime < VALIDATION_MARKER_TTL
+
+
+def _clear_validation_ok() -> None:
+    try:
+        (_resolve_state_dir() / VALIDATION_MARKER).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Nao foi possivel remover marcador de validacao: {e}")
+
+
+def _mark_validation_ok() -> None:
+    marker = _resolve_state_dir() / VALIDATION_MARKER
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(f"{time.time()}\n")
+    except OSError as e:
+        logger.warning(f"Nao foi possivel gravar marcador de validacao: {e}")
+
+
+_STATE_DIR: Path | None = None
+
+
+def _resolve_state_dir() -> Path:
+    """Diretorio de estado dos modulos, resolvido uma vez por sessao.
+
+    So o diretorio principal e memoizado: o fallback em $HOME continua sendo
+    reavaliado porque o CLI pode criar o principal no meio da sessao.
+    """
+    global _STATE_DIR
+    if _STATE_DIR is not None:
+        return _STATE_DIR
+    state_dir = Path(os.environ.get("RAIJIN_STATE_DIR", "/var/lib/raijin-server/state"))
+    if state_dir.exists():
+        _STATE_DIR = state_dir
+        return state_dir
+    return Path.home() / ".local/share/raijin-server/state"
+
+
+def _done_modules(state_dir: Path) -> set:
+    """Modulos concluidos segundo os arquivos `<modulo>.done` (uma leitura do diretorio)."""
+    try:
+        with os.scandir(state_dir) as entries:
+            return {entry.name[:-5] for entry in entries if entry.name.endswith(".done")}
+    except OSError:
+        return set()
+
+
 def check_module_dependencies(module: str, ctx: ExecutionContext) -> bool:
     """Verifica se os modulos dependentes ja foram executados.
 
@@ -244,17 +524,12 @@ def check_module_dependencies(module: str, ctx: ExecutionContext) -> bool:
         return True
 
     required = MODULE_DEPENDENCIES[module]
-    missing = []
 
     # Verifica arquivos de estado
-    state_dir = Path(os.environ.get("RAIJIN_STATE_DIR", "/var/lib/raijin-server/state"))
-    if not state_dir.exists():
-        state_dir = Path.home() / ".local/share/raijin-server/state"
+    state_dir = _resolve_state_dir()
 
-    for dep in required:
-        state_file = state_dir / f"{dep}.done"
-        if not state_file.exists():
-            missing.append(dep)
+    done = _done_modules(state_dir)
+    missing = [dep for dep in required if dep not in done]
 
     if missing:
         if ctx.dry_run:
@@ -283,11 +558,7 @@ def get_reverse_dependencies(module: str) -> List[str]:
     Returns:
         Lista de modulos que dependem deste modulo
     """
-    dependents = []
-    for mod, deps in MODULE_DEPENDENCIES.items():
-        if module in deps:
-            dependents.append(mod)
-    return dependents
+    return list(_REVERSE_DEPENDENCIES.get(module, ()))
 
 
 def get_installed_dependents(module: str) -> List[str]:
@@ -299,19 +570,9 @@ def get_installed_dependents(module: str) -> List[str]:
     Returns:
         Lista de modulos instalados que dependem deste modulo
     """
-    state_dir = Path(os.environ.get("RAIJIN_STATE_DIR", "/var/lib/raijin-server/state"))
-    if not state_dir.exists():
-        state_dir = Path.home() / ".local/share/raijin-server/state"
-    
-    dependents = get_reverse_dependencies(module)
-    installed = []
-    
-    for dep in dependents:
-        state_file = state_dir / f"{dep}.done"
-        if state_file.exists():
-            installed.append(dep)
-    
-    return installed
+    state_dir = _resolve_state_dir()
+    done = _done_modules(state_dir)
+    return [dep for dep in _REVERSE_DEPENDENCIES.get(module, ()) if dep in done]
 
 
 def check_uninstall_safety(module: str) -> Tuple[bool, List[str], str]:
@@ -323,22 +584,24 @@ def check_uninstall_safety(module: str) -> Tuple[bool, List[str], str]:
     Returns:
         Tupla (is_safe, affected_modules, warning_message)
     """
-    installed_dependents = get_installed_dependents(module)
-    
-    if not installed_dependents:
+    # Uma unica leitura do diretorio de estado para toda a arvore
+    done = _done_modules(_resolve_state_dir())
+    if not _transitive_dependents(module) & done:
         return True, [], ""
     
-    # Constroi arvore de impacto (recursivo)
-    all_affected = set(installed_dependents)
-    to_check = list(installed_dependents)
-    
+    # Arvore de impacto: percorre apenas modulos instalados (um dependente
+    # alcancavel so por intermediarios ausentes nao e afetado pela remocao)
+    all_affected = set()
+    to_check = [module]
     while to_check:
-        current = to_check.pop(0)
-        sub_dependents = get_installed_dependents(current)
-        for sub in sub_dependents:
-            if sub not in all_affected:
-                all_affected.add(sub)
-                to_check.append(sub)
+        current = to_check.pop()
+        for dependent in _REVERSE_DEPENDENCIES.get(current, ()):
+            if dependent in done and dependent not in all_affected:
+                all_affected.add(dependent)
+                to_check.append(dependent)
+    
+    if not all_affected:
+        return True, [], ""
     
     affected_list = sorted(list(all_affected))
     
@@ -1,11 +1,9 @@
-from raijin_server.modules.full_install import INSTALL_SEQUENCE
+from raijin_server.modules.full_install import INSTALL_SEQUENCE_NAMES
 
 
 def test_full_install_includes_secrets():
-    names = [name for name, *_ in INSTALL_SEQUENCE]
-    assert "secrets" in names
+    assert "secrets" in INSTALL_SEQUENCE_NAMES
 
 
 def test_full_install_includes_cert_manager():
-    names = [name for name, *_ in INSTALL_SEQUENCE]
-    assert "cert_manager" in names
+    assert "cert_manager" in INSTALL_SEQUENCE_NAMES
@@ -0,0 +1,120 @@
+import logging
+import random
+import subprocess
+import sys
+
+import pytest
+
+from raijin_server import utils
+from raijin_server.utils import (
+    BufferedRotatingFileHandler,
+    CachedTimeFormatter,
+    ExecutionContext,
+    _backoff_delay,
+    apt_install,
+    run_cmd_async,
+    run_cmd,
+    run_concurrently,
+)
+
+
+def test_backoff_delay_full_jitter_within_bounds():
+    ctx = ExecutionContext(retry_delay=10, retry_backoff=2.0, rng=random.Random(42))
+    for attempt in range(1, 6):
+        delay = _backoff_delay(ctx, attempt)
+        assert 0 <= delay <= 10 * 2.0 ** (attempt - 1)
+
+
+def test_backoff_delay_capped_by_retry_max_delay():
+    ctx = ExecutionContext(retry_delay=10, retry_backoff=10.0, retry_max_delay=30, rng=random.Random(0))
+    assert all(_backoff_delay(ctx, 5) <= 30 for _ in range(50))
+
+
+def test_buffered_handler_batches_until_capacity(tmp_path):
+    log_file = tmp_path / "raijin.log"
+    handler = BufferedRotatingFileHandler(log_file, capacity=3, flush_interval=3600)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for msg in ("a", "b"):
+            handler.handle(logging.makeLogRecord({"msg": msg, "levelno": logging.INFO}))
+        assert log_file.read_text() == ""
+        handler.handle(logging.makeLogRecord({"msg": "c", "levelno": logging.INFO}))
+        assert log_file.read_text() == "a\nb\nc\n"
+        handler.handle(logging.makeLogRecord({"msg": "boom", "levelno": logging.ERROR}))
+        assert log_file.read_text().endswith("boom\n")
+    finally:
+        handler.close()
+
+
+def test_message_log_aggregates_consecutive_repeats():
+    ctx = ExecutionContext()
+    for _ in range(3):
+        ctx.warnings.append("mirror lento")
+    ctx.warnings.append("outro aviso")
+    ctx.warnings.append("mirror lento")
+    assert list(ctx.warnings) == ["mirror lento (x3)", "outro aviso", "mirror lento"]
+
+
+def test_run_concurrently_collects_async_results():
+    ctx = ExecutionContext(max_retries=1)
+    first, second = run_concurrently(
+        run_cmd_async(["echo", "a"], ctx), run_cmd_async(["echo", "b"], ctx)
+    )
+    assert (first.stdout, second.stdout) == ("a\n", "b\n")
+
+
+def test_cached_time_formatter_matches_default_asctime():
+    fmt = "%(asctime)s %(message)s"
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "msg", None, None)
+    cached = CachedTimeFormatter(fmt)
+    assert cached.format(record) == logging.Formatter(fmt).format(record)
+    record.created += 0.25
+    record.msecs = (record.msecs + 250) % 1000
+    assert cached.format(record) == logging.Formatter(fmt).format(record)
+
+
+def test_run_cmd_stream_output_survives_non_utf8_bytes():
+    ctx = ExecutionContext(timeout=30, max_retries=1)
+    script = "import sys; sys.stdout.buffer.write(b'\\xff\\n' + b'x' * 200_000 + b'\\nfim\\n')"
+    result = run_cmd([sys.executable, "-c", script], ctx, stream_output=True)
+    assert result.returncode == 0
+    assert result.stdout.startswith("\ufffd\n")
+    assert result.stdout.endswith("fim\n")
+
+
+def test_run_cmd_stream_output_keeps_only_tail_on_failure(monkeypatch):
+    monkeypatch.setattr(utils, "STREAM_TAIL_LINES", 3)
+    ctx = ExecutionContext(timeout=30, max_retries=1)
+    script = "import sys; print('\\n'.join(str(i) for i in range(10))); sys.exit(3)"
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        run_cmd([sys.executable, "-c", script], ctx, stream_output=True)
+    assert excinfo.value.returncode == 3
+    assert excinfo.value.output == "7\n8\n9\n"
+
+
+@pytest.fixture
+def apt_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(utils, "_installed_packages", lambda: {"curl", "git"})
+    monkeypatch.setattr(utils, "run_cmd", lambda cmd, ctx, **kwargs: calls.append(cmd))
+    return calls
+
+
+@pytest.mark.parametrize(
+    ("packages", "expected"),
+    [
+        (["jq", "htop", "jq"], [["apt-get", "install", "-y", "jq", "htop"]]),
+        (["curl", "jq", "git"], [["apt-get", "install", "-y", "jq"]]),
+        (["curl", "git"], []),
+        (["curl=8.5.0-2ubuntu10", "jq"], [["apt-get", "install", "-y", "curl=8.5.0-2ubuntu10", "jq"]]),
+        ([], []),
+    ],
+)
+def test_apt_install_dedups_and_skips_installed(apt_calls, packages, expected):
+    apt_install(packages, ExecutionContext())
+    assert apt_calls == expected
+
+
+def test_apt_install_dry_run_shows_full_request(apt_calls):
+    apt_install(["curl", "jq"], ExecutionContext(dry_run=True))
+    assert apt_calls == [["apt-get", "install", "-y", "curl", "jq"]]
@@ -0,0 +1,147 @@
+import os
+import subprocess
+import time
+
+import pytest
+
+from raijin_server import validators
+from raijin_server.validators import _parse_os_release
+
+UBUNTU_OS_RELEASE = """PRETTY_NAME="Ubuntu 24.04.1 LTS"
+NAME="Ubuntu"
+VERSION_ID="24.04"
+VERSION="24.04.1 LTS (Noble Numbat)"
+ID=ubuntu
+ID_LIKE=debian
+# comentario
+"""
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (UBUNTU_OS_RELEASE, {"ID": "ubuntu", "ID_LIKE": "debian", "VERSION_ID": "24.04", "NAME": "Ubuntu"}),
+        ("ID='pop'\nID_LIKE=\"ubuntu debian\"\n", {"ID": "pop", "ID_LIKE": "ubuntu debian"}),
+        ("URL=https://exemplo/?a=b\n", {"URL": "https://exemplo/?a=b"}),
+        ("\n# so comentario=1\n", {}),
+    ],
+)
+def test_parse_os_release(content, expected):
+    info = _parse_os_release(content)
+    assert {key: info.get(key) for key in expected} == expected
+    assert all(not key.startswith("#") for key in info)
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(validators, "_STATE_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    ("age", "expected"),
+    [(0, True), (validators.VALIDATION_MARKER_TTL - 60, True), (validators.VALIDATION_MARKER_TTL + 60, False)],
+)
+def test_validation_marker_ttl(state_dir, age, expected):
+    validators._mark_validation_ok()
+    marker = state_dir / validators.VALIDATION_MARKER
+    stamp = time.time() - age
+    os.utime(marker, (stamp, stamp))
+    assert validators._recent_validation_ok() is expected
+
+
+def test_validation_marker_missing_or_cleared(state_dir):
+    assert validators._recent_validation_ok() is False
+    validators._mark_validation_ok()
+    validators._clear_validation_ok()
+    assert validators._recent_validation_ok() is False
+
+
+def test_fping_any_argv_and_timeout(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append((cmd, kwargs["timeout"]))
+        return subprocess.CompletedProcess(cmd, 0, stdout="1.1.1.1\n")
+
+    monkeypatch.setattr(validators.subprocess, "run", fake_run)
+    assert validators._fping_any(["8.8.8.8", "1.1.1.1"], 3, 1.5) == "1.1.1.1"
+    assert calls == [(["fping", "-a", "-q", "-r", "2", "-t", "1500", "8.8.8.8", "1.1.1.1"], 5.5)]
+
+
+def _fail(exc):
+    def _raise(*args):
+        raise exc
+
+    return _raise
+
+
+@pytest.mark.parametrize(
+    ("has_fping", "fping", "icmp_socket", "expected", "expected_calls"),
+    [
+        (True, "1.1.1.1", "unused", "1.1.1.1", ["fping"]),
+        (True, None, "unused", None, ["fping"]),
+        (True, OSError("exec"), "8.8.8.8", "8.8.8.8", ["fping", "socket"]),
+        (True, subprocess.TimeoutExpired("fping", 1), None, None, ["fping", "socket"]),
+        (False, "unused", "8.8.8.8", "8.8.8.8", ["socket"]),
+        (False, "unused", PermissionError("ping_group_range"), "9.9.9.9", ["socket", "processes"]),
+        (True, OSError("exec"), OSError("socket"), "9.9.9.9", ["fping", "socket", "processes"]),
+    ],
+)
+def test_ping_any_fallback_order(monkeypatch, has_fping, fping, icmp_socket, expected, expected_calls):
+    calls = []
+
+    def probe(name, outcome):
+        def _probe(hosts, count, timeout):
+            calls.append(name)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        return _probe
+
+    monkeypatch.setattr(validators, "_path_executables", lambda path: frozenset({"fping"} if has_fping else ()))
+    monkeypatch.setattr(validators, "_fping_any", probe("fping", fping))
+    monkeypatch.setattr(validators, "_icmp_socket_any", probe("socket", icmp_socket))
+    monkeypatch.setattr(validators, "_ping_processes_any", probe("processes", "9.9.9.9"))
+    assert validators._ping_any(["8.8.8.8", "1.1.1.1"], 1, 1.0) == expected
+    assert calls == expected_calls
+
+
+def test_icmp_socket_any_skips_socket_when_nothing_resolves(monkeypatch):
+    monkeypatch.setattr(validators.socket, "gethostbyname", _fail(OSError("nxdomain")))
+    monkeypatch.setattr(validators.socket, "socket", _fail(AssertionError("socket aberto sem enderecos")))
+    assert validators._icmp_socket_any(["nao-existe.invalid"], 1, 1.0) is None
+
+
+def test_icmp_socket_any_propagates_permission_error(monkeypatch):
+    monkeypatch.setattr(validators.socket, "socket", _fail(PermissionError("ping_group_range")))
+    with pytest.raises(PermissionError):
+        validators._icmp_socket_any(["127.0.0.1"], 1, 1.0)
+
+
+@pytest.fixture
+def fake_ping(tmp_path, monkeypatch):
+    # Responde na hora para 192.0.2.1, falha para 192.0.2.2 e fica pendurado nos demais
+    script = tmp_path / "ping"
+    script.write_text(
+        "#!/bin/sh\n"
+        'for host; do :; done\n'
+        'case "$host" in 192.0.2.1) exit 0 ;; 192.0.2.2) exit 1 ;; esac\n'
+        "exec sleep 30\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.mark.parametrize(
+    ("hosts", "expected"),
+    [
+        (["192.0.2.9", "192.0.2.1"], "192.0.2.1"),
+        (["192.0.2.2", "192.0.2.2"], None),
+    ],
+)
+def test_ping_processes_any_returns_first_reachable_without_waiting(fake_ping, hosts, expected):
+    start = time.monotonic()
+    assert validators._ping_processes_any(hosts, 1, 10.0) == expected
+    assert time.monotonic() - start < 5
@@ -0,0 +1,79 @@
+import pytest
+
+from raijin_server.modules.vpn_manager import (
+    _config_requires_wg_quick,
+    _parse_wg_dump,
+    _route_restore_cmds,
+    _ufw_status_has_rule,
+)
+
+WG_DUMP = (
+    "cHJpdmF0ZQ==\tcHVibGlj\t51820\toff\n"
+    "cGVlcjE=\t(none)\t203.0.113.5:41000\t10.8.0.2/32,192.168.50.0/24\t1700000000\t2048\t4096\t25\n"
+    "cGVlcjI=\t(none)\t(none)\t10.8.0.3/32\t0\t0\t0\toff\n"
+)
+
+UFW_STATUS = """Status: active
+
+To                         Action      From
+--                         ------      ----
+22/tcp                     ALLOW       Anywhere
+51820/udp                  ALLOW       Anywhere                   # WireGuard VPN
+51820/udp (v6)             ALLOW       Anywhere (v6)              # WireGuard VPN
+"""
+
+
+def test_parse_wg_dump_reads_interface_and_peers():
+    interface, peers = _parse_wg_dump(WG_DUMP)
+    assert interface == {"public_key": "cHVibGlj", "listen_port": "51820", "fwmark": "off"}
+    assert [peer["public_key"] for peer in peers] == ["cGVlcjE=", "cGVlcjI="]
+    assert peers[0]["allowed_ips"] == "10.8.0.2/32,192.168.50.0/24"
+    assert (peers[0]["latest_handshake"], peers[0]["rx_bytes"], peers[0]["tx_bytes"]) == (1700000000, 2048, 4096)
+    assert peers[1]["endpoint"] == "(none)"
+
+
+@pytest.mark.parametrize("output", ["", "\n", "somente-interface\n"])
+def test_parse_wg_dump_tolerates_empty_or_short_output(output):
+    interface, peers = _parse_wg_dump(output)
+    assert interface == {}
+    assert peers == []
+
+
+@pytest.mark.parametrize(
+    ("output", "port", "expected"),
+    [
+        (UFW_STATUS, "51820", True),
+        (UFW_STATUS, "51821", False),
+        (UFW_STATUS, "22", False),
+        ("Status: inactive\n", "51820", None),
+        ("", "51820", None),
+    ],
+)
+def test_ufw_status_has_rule(output, port, expected):
+    assert _ufw_status_has_rule(output, port) is expected
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        ("[Interface]\nAddress = 10.8.0.1/24\n[Peer]\nAllowedIPs = 10.8.0.2/32, 192.168.50.0/24\n", False),
+        ("[Interface]\nAddress = 10.8.0.1/24, fd00::1/64\n", True),
+        ("[Peer]\nAllowedIPs = 0.0.0.0/0\n", True),
+        ("[Peer]\nAllowedIPs = ::/0\n", True),
+        ("", False),
+    ],
+)
+def test_config_requires_wg_quick(config, expected):
+    assert _config_requires_wg_quick(config) is expected
+
+
+def test_route_restore_cmds_cover_every_allowed_ip():
+    _, peers = _parse_wg_dump(WG_DUMP)
+    peers.append({"allowed_ips": "fd00::2/128"})
+    peers.append({"allowed_ips": "(none)"})
+    assert _route_restore_cmds(peers) == [
+        ["ip", "route", "replace", "10.8.0.2/32", "dev", "wg0"],
+        ["ip", "route", "replace", "192.168.50.0/24", "dev", "wg0"],
+        ["ip", "route", "replace", "10.8.0.3/32", "dev", "wg0"],
+        ["ip", "-6", "route", "replace", "fd00::2/128", "dev", "wg0"],
+    ]